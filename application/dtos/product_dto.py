@@ -62,11 +62,19 @@ class ProductResponseDTO(BaseModel):
     stock_quantity: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class ArchivedProductResponseDTO(ProductResponseDTO):
+    """
+    DTO for deleted (archived) product response
+    """
+    deleted_at: datetime
+
+
 class ProductListResponseDTO(BaseModel):
     """
     DTO for paginated product list response
@@ -3,16 +3,21 @@ Application Service for Product
 Orchestrates domain operations and coordinates with repositories
 """
 from decimal import Decimal
-from typing import List
+from typing import Callable, Collection, List, Optional
 from uuid import UUID
 
 from application.dtos.product_dto import (
+    ArchivedProductResponseDTO,
     CreateProductDTO,
     ProductResponseDTO,
     UpdateProductDTO,
     UpdateStockDTO,
 )
 from domain.entities.product import Product
+from domain.exceptions.product_exceptions import (
+    ConcurrencyConflictError,
+    PreconditionFailedError,
+)
 from domain.repositories.product_repository import ProductRepository
 
 
@@ -22,11 +27,14 @@ class ProductService:
     Coordinates between domain entities and repositories
     """
 
-    def __init__(self, product_repository: ProductRepository):
+    def __init__(self, product_repository: ProductRepository, max_update_retries: int = 0):
         """
         Initialize service with product repository
+        max_update_retries: how many times a write that lost an optimistic
+        concurrency race is re-read and re-applied before giving up
         """
         self._repository = product_repository
+        self._max_update_retries = max_update_retries
 
     def create_product(self, dto: CreateProductDTO) -> ProductResponseDTO:
         """
@@ -57,6 +65,14 @@ class ProductService:
         
         return self._to_response_dto(product)
 
+    def get_products_by_ids(self, product_ids: List[UUID]) -> List[ProductResponseDTO]:
+        """
+        Get several products by ID, in the requested order
+        Unknown IDs are left out
+        """
+        products = self._repository.get_many(product_ids)
+        return [self._to_response_dto(product) for product in products]
+
     def get_all_products(self, skip: int = 0, limit: int = 100) -> List[ProductResponseDTO]:
         """
         Get all products with pagination
@@ -64,61 +80,46 @@ class ProductService:
         products = self._repository.get_all(skip=skip, limit=limit)
         return [self._to_response_dto(product) for product in products]
 
-    def update_product(self, product_id: UUID, dto: UpdateProductDTO) -> ProductResponseDTO:
+    def update_product(
+        self,
+        product_id: UUID,
+        dto: UpdateProductDTO,
+        expected_versions: Optional[Collection[int]] = None
+    ) -> ProductResponseDTO:
         """
         Update product information
+        If expected_versions is given (If-Match), the update only applies
+        to one of those exact versions and is never retried
         """
-        # Get existing product
-        product = self._repository.get_by_id(product_id)
-        if not product:
-            raise ValueError(f"Product with ID {product_id} not found")
+        def apply_changes(product: Product) -> None:
+            # Update fields using domain methods
+            if dto.name is not None:
+                product.update_name(dto.name)
 
-        # Update fields using domain methods
-        if dto.name is not None:
-            product.update_name(dto.name)
-        
-        if dto.description is not None:
-            product.update_description(dto.description)
-        
-        if dto.price is not None:
-            product.update_price(dto.price)
-        
-        if dto.stock_quantity is not None:
-            product.update_stock(dto.stock_quantity)
+            if dto.description is not None:
+                product.update_description(dto.description)
 
-        # Save updated product
-        saved_product = self._repository.save(product)
-        return self._to_response_dto(saved_product)
+            if dto.price is not None:
+                product.update_price(dto.price)
+
+            if dto.stock_quantity is not None:
+                product.update_stock(dto.stock_quantity)
+
+        return self._apply_update(product_id, apply_changes, expected_versions)
 
     def increase_stock(self, product_id: UUID, dto: UpdateStockDTO) -> ProductResponseDTO:
         """
         Increase product stock
         """
-        product = self._repository.get_by_id(product_id)
-        if not product:
-            raise ValueError(f"Product with ID {product_id} not found")
-
         # Use domain method to increase stock
-        product.increase_stock(dto.quantity)
-
-        # Save updated product
-        saved_product = self._repository.save(product)
-        return self._to_response_dto(saved_product)
+        return self._apply_update(product_id, lambda product: product.increase_stock(dto.quantity))
 
     def reduce_stock(self, product_id: UUID, dto: UpdateStockDTO) -> ProductResponseDTO:
         """
         Reduce product stock
         """
-        product = self._repository.get_by_id(product_id)
-        if not product:
-            raise ValueError(f"Product with ID {product_id} not found")
-
         # Use domain method to reduce stock (includes validation)
-        product.reduce_stock(dto.quantity)
-
-        # Save updated product
-        saved_product = self._repository.save(product)
-        return self._to_response_dto(saved_product)
+        return self._apply_update(product_id, lambda product: product.reduce_stock(dto.quantity))
 
     def delete_product(self, product_id: UUID) -> bool:
         """
@@ -129,6 +130,58 @@ class ProductService:
         
         return self._repository.delete(product_id)
 
+    def get_archived_product(self, product_id: UUID) -> ArchivedProductResponseDTO:
+        """
+        Get a deleted product by ID
+        Raises exception if not found
+        """
+        product = self._repository.get_archived_by_id(product_id)
+        if not product:
+            raise ValueError(f"Archived product with ID {product_id} not found")
+
+        return ArchivedProductResponseDTO(
+            **self._to_response_dto(product).model_dump(),
+            deleted_at=product.deleted_at
+        )
+
+    def _apply_update(
+        self,
+        product_id: UUID,
+        apply_changes: Callable[[Product], None],
+        expected_versions: Optional[Collection[int]] = None
+    ) -> ProductResponseDTO:
+        """
+        Read a product, apply domain changes and save it with a version check
+        Lost races are retried on a fresh read up to max_update_retries times
+        """
+        retries_left = self._max_update_retries if expected_versions is None else 0
+
+        while True:
+            product = self._repository.get_by_id(product_id)
+            if not product:
+                raise ValueError(f"Product with ID {product_id} not found")
+
+            if expected_versions is not None and product.version not in expected_versions:
+                raise PreconditionFailedError(product_id, expected_versions, product.version)
+
+            apply_changes(product)
+
+            try:
+                saved_product = self._repository.save(product)
+            except ConcurrencyConflictError:
+                if expected_versions is not None:
+                    # The version the client sent (If-Match) no longer holds
+                    current = self._repository.get_by_id(product_id)
+                    if not current:
+                        raise ValueError(f"Product with ID {product_id} not found")
+                    raise PreconditionFailedError(product_id, expected_versions, current.version)
+                if retries_left <= 0:
+                    raise
+                retries_left -= 1
+                continue
+
+            return self._to_response_dto(saved_product)
+
     def _to_response_dto(self, product: Product) -> ProductResponseDTO:
         """
         Convert domain entity to response DTO
@@ -140,5 +193,6 @@ class ProductService:
             price=product.price,
             stock_quantity=product.stock_quantity,
             created_at=product.created_at,
-            updated_at=product.updated_at
+            updated_at=product.updated_at,
+            version=product.version
         )
@@ -0,0 +1,108 @@
+"""
+HTTP throughput benchmark
+Compares server setups (single uvicorn process vs gunicorn workers)
+by hammering one URL with keep-alive connections from several client processes
+(run the client on a different machine than the server for meaningful numbers)
+
+Usage:
+    python benchmarks/bench_server.py http://localhost:8000/api/products?limit=20 \
+        --clients 32 --duration 30
+"""
+import argparse
+import http.client
+import multiprocessing
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def run_connection(url: str, deadline: float, counters: list, latencies: list) -> None:
+    """
+    Issue sequential keep-alive requests on one connection until deadline
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            counters[0 if response.status < 500 else 1] += 1
+        except (OSError, http.client.HTTPException):
+            counters[1] += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+        latencies.append(time.perf_counter() - start)
+
+    conn.close()
+
+
+def run_client(url: str, duration: float, connections: int, results) -> None:
+    """
+    Drive several connections concurrently from one process (one thread each)
+    Appends (ok_count, error_count, latencies) to results
+    """
+    deadline = time.perf_counter() + duration
+    counters = [[0, 0] for _ in range(connections)]
+    latencies = [[] for _ in range(connections)]
+    threads = [
+        threading.Thread(target=run_connection, args=(url, deadline, counters[i], latencies[i]))
+        for i in range(connections)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results.append((
+        sum(counter[0] for counter in counters),
+        sum(counter[1] for counter in counters),
+        [latency for chunk in latencies for latency in chunk],
+    ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(), help="client processes")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    args = parser.parse_args()
+
+    processes = max(1, min(args.processes, args.clients))
+    per_process = [args.clients // processes + (1 if i < args.clients % processes else 0) for i in range(processes)]
+
+    with multiprocessing.Manager() as manager:
+        results = manager.list()
+        workers = [
+            multiprocessing.Process(target=run_client, args=(args.url, args.duration, count, results))
+            for count in per_process
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results = list(results)
+
+    ok = sum(result[0] for result in results)
+    errors = sum(result[1] for result in results)
+    latencies = sorted(latency for result in results for latency in result[2])
+    if not latencies:
+        print("no requests completed")
+        return
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"requests: {ok} ok, {errors} errors in {args.duration:.0f}s with {args.clients} connections")
+    print(f"throughput: {ok / args.duration:.1f} req/s")
+    print(
+        f"latency: p50 {quantiles[49] * 1000:.1f} ms, "
+        f"p95 {quantiles[94] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,8 @@ class Product:
     stock_quantity: int
     created_at: datetime
     updated_at: datetime
+    version: int = 1
+    deleted_at: Optional[datetime] = None
 
     @classmethod
     def create(
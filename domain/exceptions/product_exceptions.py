@@ -0,0 +1,39 @@
+"""
+Domain Exceptions for Product
+Raised when a product write conflicts with a concurrent change
+"""
+from typing import Collection, Optional
+from uuid import UUID
+
+
+class ConcurrencyConflictError(Exception):
+    """
+    Raised when a product was modified by someone else
+    between reading it and writing it back
+    """
+
+    def __init__(self, product_id: UUID, expected_version: int, message: Optional[str] = None):
+        self.product_id = product_id
+        self.expected_version = expected_version
+        super().__init__(
+            message
+            or f"Product with ID {product_id} was modified concurrently (expected version {expected_version})"
+        )
+
+
+class PreconditionFailedError(ConcurrencyConflictError):
+    """
+    Raised when none of the versions supplied by the client (If-Match)
+    is the current version of the product
+    expected_version holds the highest of them
+    """
+
+    def __init__(self, product_id: UUID, expected_versions: Collection[int], current_version: int):
+        self.expected_versions = sorted(expected_versions)
+        self.current_version = current_version
+        listed = ", ".join(str(version) for version in self.expected_versions)
+        super().__init__(
+            product_id,
+            self.expected_versions[-1],
+            f"Product with ID {product_id} is at version {current_version}, expected version {listed}"
+        )
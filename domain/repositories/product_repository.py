@@ -4,7 +4,7 @@ Defines contract for product data access
 Domain layer only knows about the interface, not the implementation
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from uuid import UUID
 
 from domain.entities.product import Product
@@ -20,6 +20,9 @@ class ProductRepository(ABC):
     def save(self, product: Product) -> Product:
         """
         Save or update a product
+        Updates only apply if the stored version still equals product.version,
+        otherwise ConcurrencyConflictError is raised
+        Returns the stored product with its new version
         """
         pass
 
@@ -31,10 +34,29 @@ class ProductRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_many(self, product_ids: Sequence[UUID]) -> List[Product]:
+        """
+        Get several products by ID
+        Returns the products found, in the order of product_ids;
+        missing IDs are skipped and repeated IDs returned once
+        """
+        pass
+
     @abstractmethod
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
         """
         Get all products with pagination
+        Products are ordered by ID
+        """
+        pass
+
+    @abstractmethod
+    def get_all_after(self, after_id: Optional[UUID] = None, limit: int = 100) -> List[Product]:
+        """
+        Get the next page of products ordered by ID (keyset pagination)
+        Returns up to limit products whose ID sorts after after_id
+        (from the start if None); cost does not grow with the page depth
         """
         pass
 
@@ -42,10 +64,20 @@ class ProductRepository(ABC):
     def delete(self, product_id: UUID) -> bool:
         """
         Delete a product by ID
+        The product is soft-deleted: it disappears from get_by_id, get_all
+        and exists, but stays reachable through get_archived_by_id
         Returns True if deleted, False if not found
         """
         pass
 
+    @abstractmethod
+    def get_archived_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get a deleted (archived) product by ID
+        Returns None if there is no archived product with this ID
+        """
+        pass
+
     @abstractmethod
     def exists(self, product_id: UUID) -> bool:
         """
@@ -0,0 +1,56 @@
+"""
+Production server configuration
+Runs the FastAPI app in several uvicorn worker processes managed by gunicorn
+
+Usage:
+    gunicorn -c gunicorn.conf.py main:app
+"""
+import os
+
+from infrastructure.database.config import settings
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may run on (respects container CPU sets)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = settings.SERVER_BIND
+workers = settings.WEB_CONCURRENCY or available_cpus()
+
+# UvicornWorker uses uvloop and httptools automatically when they are installed
+# (uvicorn[standard]), falling back to asyncio and h11 otherwise
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE
+
+# Recycle workers gracefully to bound memory growth
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+# On SIGTERM / recycle, workers stop accepting and drain in-flight requests
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+timeout = settings.SERVER_TIMEOUT
+
+accesslog = None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master process
+    The preloaded app may have opened pooled connections (create_all) that
+    must not be shared between processes
+    """
+    from infrastructure.database.config import engine, shard_engines
+
+    for inherited_engine in [engine, *shard_engines]:
+        inherited_engine.dispose(close=False)
@@ -2,43 +2,242 @@
 Product Controller
 Handles HTTP requests and responses for product endpoints
 """
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, List, Optional, Set
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from anyio import from_thread
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from application.dtos.product_dto import (
+    ArchivedProductResponseDTO,
     CreateProductDTO,
     ProductResponseDTO,
     UpdateProductDTO,
     UpdateStockDTO,
 )
 from application.services.product_service import ProductService
-from infrastructure.database.config import get_db
+from domain.exceptions.product_exceptions import (
+    ConcurrencyConflictError,
+    PreconditionFailedError,
+)
+from domain.repositories.product_repository import ProductRepository
+from infrastructure.api.middleware.concurrency_limiter import DeferredAdmission
+from infrastructure.cache.listing_cache import CatalogGeneration, ListingCache
+from infrastructure.database.config import (
+    get_db,
+    get_shard_dbs,
+    settings,
+)
+from infrastructure.repositories.generation_tracking_product_repository import (
+    GenerationTrackingProductRepository,
+)
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
 from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+from infrastructure.repositories.sharded_product_repository import ShardedProductRepository
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Process-wide catalog used when PRODUCT_REPOSITORY_BACKEND is "memory"
+in_memory_repository = InMemoryProductRepository()
+
+# Bumped on every catalog write; shared with workers forked after import
+catalog_generation = CatalogGeneration()
+listing_cache = ListingCache(
+    catalog_generation,
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+    max_bytes=settings.LISTING_CACHE_MAX_BYTES,
+    max_age=settings.LISTING_CACHE_MAX_AGE_SECONDS,
+)
+product_list_adapter = TypeAdapter(List[ProductResponseDTO])
+
+# Threads used by the sharded backend to query shards in parallel
+shard_executor = ThreadPoolExecutor(
+    max_workers=settings.SHARD_FANOUT_WORKERS,
+    thread_name_prefix="shard-fanout",
+)
+
+
+def get_product_repository(
+    db: Session = Depends(get_db),
+    shard_dbs: List[Session] = Depends(get_shard_dbs)
+) -> ProductRepository:
+    """
+    Dependency injection for ProductRepository
+    Selects the implementation configured in settings; writes through it
+    invalidate the listing cache
+    """
+    if settings.PRODUCT_REPOSITORY_BACKEND == "memory":
+        repository = in_memory_repository
+    elif settings.PRODUCT_REPOSITORY_BACKEND == "sharded":
+        repository = ShardedProductRepository(
+            [MySQLProductRepository(shard_db) for shard_db in shard_dbs],
+            shard_executor,
+        )
+    else:
+        repository = MySQLProductRepository(db)
+    return GenerationTrackingProductRepository(repository, catalog_generation)
+
 
-def get_product_service(db: Session = Depends(get_db)) -> ProductService:
+def get_product_service(
+    repository: ProductRepository = Depends(get_product_repository)
+) -> ProductService:
     """
     Dependency injection for ProductService
-    Creates repository and service instances
+    Creates service instance on top of the configured repository
+    """
+    return ProductService(repository, max_update_retries=settings.PRODUCT_UPDATE_RETRIES)
+
+
+@contextmanager
+def product_service_scope() -> Iterator[ProductService]:
+    """
+    ProductService for one unit of work outside request dependencies
+    Opens the sessions of the configured backend on entry and closes them on exit
+    """
+    with contextmanager(get_db)() as db, contextmanager(get_shard_dbs)() as shard_dbs:
+        yield get_product_service(get_product_repository(db, shard_dbs))
+
+
+async def get_product_service_scope() -> Callable[[], ContextManager[ProductService]]:
+    """
+    Dependency injection for endpoints that only sometimes need a ProductService
+    (e.g. on a cache miss), so sessions are not opened for every request
+    Async so resolving it does not take a worker thread
+    """
+    return product_service_scope
+
+
+def raise_overloaded(admission: DeferredAdmission):
+    """
+    Shed a request whose deferred admission was refused
+    """
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is overloaded, please retry later",
+        headers={"Retry-After": str(admission.retry_after)}
+    )
+
+
+@contextmanager
+def hold_admission_from_thread(admission: Optional[DeferredAdmission]) -> Iterator[None]:
+    """
+    Take a deferred route class slot from a worker thread for the duration of the block
+    The limiter lives on the event loop, so it is driven through anyio.from_thread
+    """
+    if admission is None:
+        yield
+        return
+
+    if not from_thread.run(admission.acquire):
+        raise_overloaded(admission)
+    try:
+        yield
+    finally:
+        from_thread.run_sync(admission.release)
+
+
+def require_writable_backend():
+    """
+    Reject writes on in-memory (edge) nodes
+    Their catalog is a per-process copy replaced on every refresh, so
+    accepted writes would be invisible to other workers and then lost
+    """
+    if settings.PRODUCT_REPOSITORY_BACKEND == "memory":
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail="This node serves a read-only catalog; send writes to the primary API",
+            headers={"Allow": "GET, HEAD"}
+        )
+
+
+def require_database_backend():
+    """
+    Reject archive lookups on in-memory (edge) nodes
+    Their catalog only holds live products, so deleted products are never found there
+    """
+    if settings.PRODUCT_REPOSITORY_BACKEND == "memory":
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Archived products are not served by this node; query the primary API"
+        )
+
+
+def parse_if_match(if_match: Optional[str] = Header(None)) -> Optional[Set[int]]:
+    """
+    Parse the If-Match header into the product versions it accepts
+    Accepts the ETag returned by GET/PUT ("3") or a list of them ("3", "4");
+    "*" matches any version
+    If-Match uses strong comparison, so weak tags (W/"3") never match
     """
-    repository = MySQLProductRepository(db)
-    return ProductService(repository)
+    if if_match is None or if_match.strip() == "*":
+        return None
 
+    versions = set()
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if not tag or tag.count('"') not in (0, 2):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid If-Match header: {if_match}"
+            )
+        if tag.startswith("W/"):
+            continue
+        tag = tag.strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
 
-@router.post("", response_model=ProductResponseDTO, status_code=status.HTTP_201_CREATED)
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not list a strong ETag of this product"
+        )
+    return versions
+
+
+def raise_conflict(error: ConcurrencyConflictError):
+    """
+    Map optimistic concurrency failures to HTTP responses
+    412 when If-Match did not match, 409 when a concurrent write won the race
+    """
+    if isinstance(error, PreconditionFailedError):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(error)
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(error)
+    )
+
+
+def set_etag(response: Response, product: ProductResponseDTO) -> ProductResponseDTO:
+    """
+    Expose the product version as ETag so clients can send it back in If-Match
+    """
+    response.headers["ETag"] = f'"{product.version}"'
+    return product
+
+
+@router.post(
+    "",
+    response_model=ProductResponseDTO,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_writable_backend)]
+)
 def create_product(
     dto: CreateProductDTO,
+    response: Response,
     service: ProductService = Depends(get_product_service)
 ):
     """
     Create a new product
     """
     try:
-        return service.create_product(dto)
+        return set_etag(response, service.create_product(dto))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,16 +245,58 @@ def create_product(
         )
 
 
+@router.get(
+    "/archive/{product_id}",
+    response_model=ArchivedProductResponseDTO,
+    dependencies=[Depends(require_database_backend)]
+)
+def get_archived_product(
+    product_id: UUID,
+    service: ProductService = Depends(get_product_service)
+):
+    """
+    Get a deleted product by ID
+    """
+    try:
+        return service.get_archived_product(product_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
+@router.get("/batch", response_model=List[ProductResponseDTO])
+def get_products_by_ids(
+    request: Request,
+    ids: List[UUID] = Query(...),
+    service: ProductService = Depends(get_product_service)
+):
+    """
+    Get several products by ID, in the requested order
+    Unknown IDs are left out of the response
+    Counts against the bulk budget: a batch may touch every shard
+    """
+    if len(ids) > settings.LISTING_MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.LISTING_MAX_LIMIT} ids can be requested at once"
+        )
+    with hold_admission_from_thread(getattr(request.state, "concurrency_admission", None)):
+        return service.get_products_by_ids(ids)
+
+
 @router.get("/{product_id}", response_model=ProductResponseDTO)
 def get_product(
     product_id: UUID,
+    response: Response,
     service: ProductService = Depends(get_product_service)
 ):
     """
     Get product by ID
     """
     try:
-        return service.get_product_by_id(product_id)
+        return set_etag(response, service.get_product_by_id(product_id))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,28 +305,57 @@ def get_product(
 
 
 @router.get("", response_model=List[ProductResponseDTO])
-def get_all_products(
-    skip: int = 0,
-    limit: int = 100,
-    service: ProductService = Depends(get_product_service)
+async def get_all_products(
+    request: Request,
+    skip: int = Query(0, ge=0, le=settings.LISTING_MAX_SKIP),
+    limit: int = Query(100, ge=1, le=settings.LISTING_MAX_LIMIT),
+    service_scope: Callable[[], ContextManager[ProductService]] = Depends(get_product_service_scope)
 ):
     """
     Get all products with pagination
+    Pages are served as pre-serialized JSON from the listing cache on the
+    event loop; only the request building a missing page takes a bulk slot
+    and a database session, requests waiting for that build take neither
+    skip is capped at LISTING_MAX_SKIP: deep pages cost every shard skip + limit rows
     """
-    return service.get_all_products(skip=skip, limit=limit)
+    key = (skip, limit)
+    body = listing_cache.get(key) if settings.LISTING_CACHE_ENABLED else None
+
+    if body is None:
+        admission = getattr(request.state, "concurrency_admission", None)
+
+        def build() -> bytes:
+            with hold_admission_from_thread(admission), service_scope() as service:
+                return product_list_adapter.dump_json(service.get_all_products(skip=skip, limit=limit))
+
+        if settings.LISTING_CACHE_ENABLED:
+            body = await run_in_threadpool(listing_cache.get_or_build, key, build)
+        else:
+            body = await run_in_threadpool(build)
 
+    return Response(content=body, media_type="application/json")
 
-@router.put("/{product_id}", response_model=ProductResponseDTO)
+
+@router.put(
+    "/{product_id}",
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(require_writable_backend)]
+)
 def update_product(
     product_id: UUID,
     dto: UpdateProductDTO,
+    response: Response,
+    expected_versions: Optional[Set[int]] = Depends(parse_if_match),
     service: ProductService = Depends(get_product_service)
 ):
     """
     Update product information
+    Send the ETag from a previous GET as If-Match to avoid lost updates
     """
     try:
-        return service.update_product(product_id, dto)
+        return set_etag(response, service.update_product(product_id, dto, expected_versions))
+    except ConcurrencyConflictError as e:
+        raise_conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,17 +363,24 @@ def update_product(
         )
 
 
-@router.post("/{product_id}/stock/increase", response_model=ProductResponseDTO)
+@router.post(
+    "/{product_id}/stock/increase",
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(require_writable_backend)]
+)
 def increase_stock(
     product_id: UUID,
     dto: UpdateStockDTO,
+    response: Response,
     service: ProductService = Depends(get_product_service)
 ):
     """
     Increase product stock
     """
     try:
-        return service.increase_stock(product_id, dto)
+        return set_etag(response, service.increase_stock(product_id, dto))
+    except ConcurrencyConflictError as e:
+        raise_conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -111,17 +388,24 @@ def increase_stock(
         )
 
 
-@router.post("/{product_id}/stock/reduce", response_model=ProductResponseDTO)
+@router.post(
+    "/{product_id}/stock/reduce",
+    response_model=ProductResponseDTO,
+    dependencies=[Depends(require_writable_backend)]
+)
 def reduce_stock(
     product_id: UUID,
     dto: UpdateStockDTO,
+    response: Response,
     service: ProductService = Depends(get_product_service)
 ):
     """
     Reduce product stock
     """
     try:
-        return service.reduce_stock(product_id, dto)
+        return set_etag(response, service.reduce_stock(product_id, dto))
+    except ConcurrencyConflictError as e:
+        raise_conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -129,13 +413,18 @@ def reduce_stock(
         )
 
 
-@router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{product_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_writable_backend)]
+)
 def delete_product(
     product_id: UUID,
     service: ProductService = Depends(get_product_service)
 ):
     """
     Delete a product
+    Deleted products remain available under /products/archive/{product_id}
     """
     try:
         service.delete_product(product_id)
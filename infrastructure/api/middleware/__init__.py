@@ -0,0 +1 @@
+# API Middleware
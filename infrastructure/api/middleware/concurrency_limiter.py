@@ -0,0 +1,294 @@
+"""
+Concurrency Limiting Middleware
+Protects DB-bound routes from overload with per-route-class budgets,
+a bounded wait queue with a deadline, and fast load shedding (503)
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Collection, Deque, Dict, Optional
+
+
+# Endpoints of the bulk class take their slot themselves (DeferredAdmission)
+BULK_PATHS = ("/api/products", "/api/products/batch")
+
+
+def classify_product_route(method: str, path: str) -> Optional[str]:
+    """
+    Map a request to its route class
+    Returns None for routes that are never limited (health, docs, metrics)
+    """
+    if not path.startswith("/api/products"):
+        return None
+
+    if "/stock/" in path:
+        return "stock"
+
+    if method == "GET":
+        # Listings and batch lookups read many rows (on every shard); single-product reads are cheap
+        return "bulk" if path.rstrip("/") in BULK_PATHS else "read"
+
+    return "write"
+
+
+class RouteClassLimiter:
+    """
+    Adaptive concurrency budget for one class of routes
+    The configured budget is a ceiling: the limit backs off multiplicatively
+    while the latency EWMA is above target_latency and grows back additively
+    while it is below and the budget is in use
+    """
+
+    BACKOFF_RATIO = 0.9
+    # Weight of a new sample in the latency EWMA; several slow samples
+    # in a row are needed before the average crosses the target
+    EWMA_WEIGHT = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        target_latency: float,
+        min_limit: int = 1
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_backoff = 0.0
+
+        # Metrics
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.latency_ewma = 0.0
+
+    @property
+    def effective_limit(self) -> int:
+        """
+        Concurrency actually allowed: the adaptive limit rounded to the
+        nearest integer, so one backoff step does not halve small budgets
+        """
+        return max(self.min_limit, int(self.limit + 0.5))
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot; returns False if the request must be shed
+        """
+        if self.in_flight < self.effective_limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        expiry = loop.call_later(self.queue_timeout, self._expire, waiter)
+
+        try:
+            granted = await waiter
+        except asyncio.CancelledError:
+            # Client went away while queued; give back a slot we may have been handed
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release(None)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            expiry.cancel()
+
+        if granted:
+            self.admitted += 1
+        return granted
+
+    def release(self, latency: Optional[float]) -> None:
+        """
+        Free a slot, adapt the limit from the observed latency and wake waiters
+        """
+        saturated = self.in_flight >= self.effective_limit
+        self.in_flight -= 1
+
+        if latency is not None:
+            self._adapt(latency, saturated)
+
+        while self._waiters and self.in_flight < self.effective_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def metrics(self) -> dict:
+        """
+        Current state and counters of this route class
+        """
+        return {
+            "limit": self.effective_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_length": len(self._waiters),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2),
+        }
+
+    def _adapt(self, latency: float, saturated: bool) -> None:
+        """
+        AIMD on the latency EWMA: back off at most once per target_latency window,
+        grow by ~1 per window of completions
+        """
+        self.latency_ewma += self.EWMA_WEIGHT * (latency - self.latency_ewma)
+
+        now = time.monotonic()
+        if self.latency_ewma > self.target_latency:
+            if now - self._last_backoff >= self.target_latency:
+                self.limit = max(float(self.min_limit), self.limit * self.BACKOFF_RATIO)
+                self._last_backoff = now
+        elif saturated:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        """
+        Queue deadline reached: shed the waiting request
+        """
+        if waiter.done():
+            return
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        self.timed_out += 1
+        waiter.set_result(False)
+
+
+class ConcurrencyLimiter:
+    """
+    Registry of route class limiters shared by the middleware and the metrics endpoint
+    """
+
+    def __init__(
+        self,
+        limiters: Dict[str, RouteClassLimiter],
+        classify: Callable[[str, str], Optional[str]] = classify_product_route,
+        retry_after: int = 1
+    ):
+        self.limiters = limiters
+        self.classify = classify
+        self.retry_after = retry_after
+
+    def limiter_for(self, method: str, path: str) -> Optional[RouteClassLimiter]:
+        """
+        Limiter guarding this request, or None if the route is not limited
+        """
+        route_class = self.classify(method, path)
+        if route_class is None:
+            return None
+        return self.limiters.get(route_class)
+
+    def metrics(self) -> dict:
+        """
+        Metrics for every route class
+        """
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+
+class DeferredAdmission:
+    """
+    Slot of a route class whose admission is left to the endpoint
+    Lets an endpoint take the slot only for work that needs it
+    (e.g. a listing cache miss) and answer everything else without waiting
+    """
+
+    def __init__(self, limiter: RouteClassLimiter, retry_after: int):
+        self.limiter = limiter
+        self.retry_after = retry_after
+        self._start: Optional[float] = None
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot; returns False if the request must be shed
+        """
+        if not await self.limiter.acquire():
+            return False
+        self._start = time.monotonic()
+        return True
+
+    def release(self) -> None:
+        """
+        Free the slot taken by acquire
+        """
+        if self._start is not None:
+            self.limiter.release(time.monotonic() - self._start)
+            self._start = None
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware applying a ConcurrencyLimiter to HTTP requests
+    Shed requests get 503 with Retry-After without reaching the application
+    Requests of deferred route classes are passed through with a
+    DeferredAdmission in request.state.concurrency_admission instead
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter, deferred: Collection[str] = ()):
+        self.app = app
+        self.limiter = limiter
+        self.deferred = frozenset(deferred)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_limiter = self.limiter.limiter_for(scope["method"], scope["path"])
+        if route_limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route_limiter.name in self.deferred:
+            scope.setdefault("state", {})["concurrency_admission"] = DeferredAdmission(
+                route_limiter, self.limiter.retry_after
+            )
+            await self.app(scope, receive, send)
+            return
+
+        if not await route_limiter.acquire():
+            await self._shed(send)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_limiter.release(time.monotonic() - start)
+
+    async def _shed(self, send) -> None:
+        """
+        Reject the request with 503 Service Unavailable
+        """
+        body = json.dumps({"detail": "Server is overloaded, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.limiter.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
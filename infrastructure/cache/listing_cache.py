@@ -0,0 +1,194 @@
+"""
+Listing Cache
+Caches fully serialized product listing responses, keyed by query parameters
+and a catalog generation counter that is bumped on every catalog write
+"""
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class CatalogGeneration:
+    """
+    Counter identifying the current state of the catalog
+    Backed by shared memory, so it is shared by every worker process forked
+    after it was created (gunicorn preload_app); bumping it invalidates the
+    listing cache of all those workers in O(1)
+    """
+
+    def __init__(self):
+        self._value = multiprocessing.Value("q", 0)
+
+    @property
+    def value(self) -> int:
+        """
+        Current generation
+        """
+        return self._value.value
+
+    def bump(self) -> int:
+        """
+        Advance to a new generation; returns it
+        """
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+
+class _PendingBuild:
+    """
+    A response being built for a cache miss, awaited by concurrent requests
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.body: Optional[bytes] = None
+
+
+class ListingCache:
+    """
+    Thread-safe LRU cache of serialized listing responses
+    - Entries are keyed by (generation, key); only the newest generation is kept
+    - Memory is bounded by max_entries and max_bytes
+    - Entries expire after max_age seconds (0 = never), a safety net for
+      writes that do not bump the generation
+    - Concurrent misses for the same key are coalesced into one build
+    """
+
+    def __init__(
+        self,
+        generation: CatalogGeneration,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_age: float = 0
+    ):
+        self._generation = generation
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+
+        self._lock = threading.Lock()
+        # key -> (body, monotonic time it was stored)
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, float]]" = OrderedDict()
+        self._entries_generation = 0
+        self._size = 0
+        self._pending: Dict[Tuple[int, Hashable], _PendingBuild] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Return the cached response for key, or None on a miss
+        Never blocks on a build, so it is safe to call from the event loop
+        """
+        generation = self._generation.value
+        with self._lock:
+            return self._lookup(generation, key)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached response for key, building it on a miss
+        The generation is read before building, so a write that happens
+        during the build makes the result unreachable instead of stale
+        """
+        generation = self._generation.value
+        pending_key = (generation, key)
+
+        with self._lock:
+            body = self._lookup(generation, key)
+            if body is not None:
+                return body
+
+            pending = self._pending.get(pending_key)
+            leader = pending is None
+            if leader:
+                pending = _PendingBuild()
+                self._pending[pending_key] = pending
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.body is not None:
+                return pending.body
+            # The leading build failed; build our own response
+            return build()
+
+        try:
+            body = build()
+            pending.body = body
+            self._store(generation, key, body)
+            return body
+        finally:
+            with self._lock:
+                del self._pending[pending_key]
+            pending.done.set()
+
+    def metrics(self) -> dict:
+        """
+        Cache size and hit/miss counters
+        """
+        with self._lock:
+            return {
+                "generation": self._generation.value,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+    def _lookup(self, generation: int, key: Hashable) -> Optional[bytes]:
+        """
+        Return a fresh entry for key and mark it recently used
+        Caller must hold the lock
+        """
+        if generation != self._entries_generation:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        body, stored_at = entry
+        if self._max_age and time.monotonic() - stored_at > self._max_age:
+            del self._entries[key]
+            self._size -= len(body)
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def _store(self, generation: int, key: Hashable, body: bytes) -> None:
+        """
+        Insert a built response and evict least recently used entries
+        """
+        if len(body) > self._max_bytes:
+            return
+
+        with self._lock:
+            if generation < self._entries_generation:
+                # Built from an older catalog than what is cached already
+                return
+            if generation > self._entries_generation:
+                self._entries.clear()
+                self._size = 0
+                self._entries_generation = generation
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+
+            self._entries[key] = (body, time.monotonic())
+            self._size += len(body)
+
+            while len(self._entries) > self._max_entries or self._size > self._max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
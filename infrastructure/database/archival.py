@@ -0,0 +1,143 @@
+"""
+Product archival
+Moves soft-deleted products from the hot products table to products_archive
+in small batches, so the hot table and its indexes only hold live products
+
+Run once (e.g. from cron):
+    python -m infrastructure.database.archival
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from infrastructure.database.config import SessionLocal, ShardSessionLocals, settings
+from infrastructure.database.models import ProductArchiveModel, ProductModel
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "stock_quantity",
+    "created_at",
+    "updated_at",
+    "version",
+    "deleted_at",
+)
+
+
+class ProductArchiver:
+    """
+    Batched mover from products to products_archive
+    Each batch is its own short transaction: candidate rows are locked with
+    SKIP LOCKED, copied with INSERT ... SELECT and deleted from the hot table
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 500,
+        grace_period: timedelta = timedelta(hours=24),
+        pause_seconds: float = 0.1
+    ):
+        """
+        grace_period: how long a deleted product stays in the hot table
+        pause_seconds: sleep between batches to leave room for live traffic
+        """
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._grace_period = grace_period
+        self._pause_seconds = pause_seconds
+
+    def archive_batch(self) -> int:
+        """
+        Move one batch of deleted products
+        Returns the number of products moved
+        """
+        now = datetime.utcnow()
+        session = self._session_factory()
+        try:
+            ids = [
+                row.id for row in session.query(ProductModel.id).filter(
+                    ProductModel.deleted_at.isnot(None),
+                    ProductModel.deleted_at < now - self._grace_period
+                ).order_by(ProductModel.deleted_at).limit(self._batch_size).with_for_update(skip_locked=True)
+            ]
+            if not ids:
+                session.rollback()
+                return 0
+
+            source = select(
+                *(getattr(ProductModel, column) for column in ARCHIVED_COLUMNS),
+                literal(now).label("archived_at")
+            ).where(ProductModel.id.in_(ids))
+            session.execute(
+                insert(ProductArchiveModel).from_select(ARCHIVED_COLUMNS + ("archived_at",), source)
+            )
+            session.query(ProductModel).filter(
+                ProductModel.id.in_(ids)
+            ).delete(synchronize_session=False)
+
+            session.commit()
+            return len(ids)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def run(self, max_batches: Optional[int] = None) -> int:
+        """
+        Move batches until nothing is left (or max_batches is reached)
+        Returns the total number of products moved
+        """
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = self.archive_batch()
+            total += moved
+            batches += 1
+            if moved < self._batch_size:
+                break
+            time.sleep(self._pause_seconds)
+        return total
+
+
+def run_archiver_periodically(archiver: ProductArchiver, interval: float, stop: threading.Event) -> None:
+    """
+    Background loop running the archiver every interval seconds
+    """
+    while not stop.wait(interval):
+        try:
+            moved = archiver.run()
+            if moved:
+                logger.info("Archived %d deleted products", moved)
+        except Exception:
+            logger.exception("Failed to archive deleted products")
+
+
+def create_archiver(session_factory: Callable[[], Session] = SessionLocal) -> ProductArchiver:
+    """
+    Build an archiver from settings for one database
+    """
+    return ProductArchiver(
+        session_factory=session_factory,
+        batch_size=settings.ARCHIVE_BATCH_SIZE,
+        grace_period=timedelta(hours=settings.ARCHIVE_GRACE_PERIOD_HOURS),
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if settings.PRODUCT_REPOSITORY_BACKEND == "sharded":
+        for shard, shard_session_factory in enumerate(ShardSessionLocals):
+            logger.info("Shard %d: archived %d deleted products", shard, create_archiver(shard_session_factory).run())
+    else:
+        logger.info("Archived %d deleted products", create_archiver().run())
@@ -25,6 +25,10 @@ class ProductModel(Base):
     stock_quantity = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Optimistic concurrency control: bumped on every update
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Soft delete: set on delete, row is later moved to products_archive
+    deleted_at = Column(DateTime, nullable=True, index=True)
 
     @classmethod
     def from_domain_entity(cls, product) -> "ProductModel":
@@ -38,7 +42,9 @@ class ProductModel(Base):
             price=product.price,
             stock_quantity=product.stock_quantity,
             created_at=product.created_at,
-            updated_at=product.updated_at
+            updated_at=product.updated_at,
+            version=product.version,
+            deleted_at=product.deleted_at
         )
 
     def to_domain_entity(self):
@@ -55,5 +61,46 @@ class ProductModel(Base):
             price=Decimal(str(self.price)),
             stock_quantity=self.stock_quantity,
             created_at=self.created_at,
-            updated_at=self.updated_at
+            updated_at=self.updated_at,
+            version=self.version,
+            deleted_at=self.deleted_at
+        )
+
+
+class ProductArchiveModel(Base):
+    """
+    SQLAlchemy model for the cold products_archive table
+    Holds deleted products moved out of the hot products table
+    Only the primary key is indexed to keep the table cheap to append to
+    """
+    __tablename__ = "products_archive"
+
+    id = Column(CHAR(36), primary_key=True)
+    name = Column(String(255), nullable=False)
+    description = Column(String(1000), nullable=True)
+    price = Column(Numeric(10, 2), nullable=False)
+    stock_quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_domain_entity(self):
+        """
+        Convert archived row to domain Product entity
+        """
+        from domain.entities.product import Product
+        from uuid import UUID
+
+        return Product(
+            id=UUID(self.id),
+            name=self.name,
+            description=self.description,
+            price=Decimal(str(self.price)),
+            stock_quantity=self.stock_quantity,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            version=self.version,
+            deleted_at=self.deleted_at
         )
@@ -0,0 +1,167 @@
+"""
+Resharding tool
+Moves products (hot and archived) from a source shard layout to a target
+shard layout, placing every row on the shard given by shard_index
+
+Typical uses:
+    # Split one database into three shards (the first one is reused)
+    python -m infrastructure.database.reshard \
+        --source mysql+pymysql://.../products_0 \
+        --target mysql+pymysql://.../products_0 \
+        --target mysql+pymysql://.../products_1 \
+        --target mysql+pymysql://.../products_2
+
+Rows are copied in primary key order in batches; each batch is committed
+on the target before it is deleted from the source, so an interrupted run
+can simply be started again. Writes must be paused while it runs.
+A database used as both source and target must be passed with the same URL.
+"""
+import argparse
+import logging
+import os
+from typing import Dict, List, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from infrastructure.database.config import Base
+from infrastructure.database.models import ProductArchiveModel, ProductModel
+from infrastructure.repositories.sharded_product_repository import shard_index
+
+logger = logging.getLogger(__name__)
+
+RESHARDED_MODELS = (ProductModel, ProductArchiveModel)
+
+DEFAULT_PORTS = {"mysql": 3306, "mariadb": 3306, "postgresql": 5432}
+
+
+def database_identity(url: str) -> Tuple:
+    """
+    Key identifying the database a URL points to
+    Ignores the driver, credentials, query parameters and an explicit default port,
+    so two spellings of the same database compare equal
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return (backend, os.path.realpath(parsed.database) if parsed.database else None)
+    return (
+        backend,
+        (parsed.host or "localhost").lower(),
+        parsed.port or DEFAULT_PORTS.get(backend),
+        parsed.database,
+    )
+
+
+def check_distinct_databases(urls: Sequence[str]) -> None:
+    """
+    Refuse URLs that spell the same database differently
+    Rows would be merged into their own database and then deleted as moved
+    """
+    seen: Dict[Tuple, str] = {}
+    for url in urls:
+        identity = database_identity(url)
+        other = seen.setdefault(identity, url)
+        if other != url:
+            raise ValueError(
+                f"{other!r} and {url!r} point to the same database; "
+                "pass it with the same URL everywhere"
+            )
+
+
+def reshard(source_urls: Sequence[str], target_urls: Sequence[str], batch_size: int = 500) -> Dict[str, int]:
+    """
+    Move every row from the source shards to its shard in the target layout
+    Rows already on the right database are left in place
+    Returns the number of moved rows per table
+    Raises ValueError if two different URLs point to the same database
+    """
+    check_distinct_databases([*source_urls, *target_urls])
+
+    engines = {url: create_engine(url) for url in {*source_urls, *target_urls}}
+    sessions = {url: sessionmaker(bind=engine) for url, engine in engines.items()}
+
+    for url in target_urls:
+        Base.metadata.create_all(bind=engines[url])
+
+    moved = {model.__tablename__: 0 for model in RESHARDED_MODELS}
+    try:
+        for source_url in source_urls:
+            for model in RESHARDED_MODELS:
+                count = _move_table(model, source_url, target_urls, sessions, batch_size)
+                moved[model.__tablename__] += count
+                logger.info("%s: moved %d rows out of %s", model.__tablename__, count, source_url)
+    finally:
+        for engine in engines.values():
+            engine.dispose()
+
+    return moved
+
+
+def _move_table(model, source_url: str, target_urls: Sequence[str], sessions, batch_size: int) -> int:
+    """
+    Move the rows of one table out of one source database
+    Walks the table by primary key (keyset pagination) so batches stay cheap
+    """
+    columns = [column.name for column in model.__table__.columns]
+    source_database = database_identity(source_url)
+    target_databases = [database_identity(url) for url in target_urls]
+    moved = 0
+    last_id = ""
+
+    while True:
+        source: Session = sessions[source_url]()
+        try:
+            rows = source.query(model).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                return moved
+            last_id = rows[-1].id
+
+            by_target: Dict[str, List[dict]] = {}
+            for row in rows:
+                shard = shard_index(UUID(row.id), len(target_urls))
+                target_url = target_urls[shard]
+                if target_databases[shard] != source_database:
+                    by_target.setdefault(target_url, []).append(
+                        {column: getattr(row, column) for column in columns}
+                    )
+
+            for target_url, values in by_target.items():
+                target: Session = sessions[target_url]()
+                try:
+                    for row_values in values:
+                        # merge makes re-runs after an interruption idempotent
+                        target.merge(model(**row_values))
+                    target.commit()
+                finally:
+                    target.close()
+
+            moved_ids = [row_values["id"] for values in by_target.values() for row_values in values]
+            if moved_ids:
+                source.query(model).filter(model.id.in_(moved_ids)).delete(synchronize_session=False)
+                source.commit()
+                moved += len(moved_ids)
+        finally:
+            source.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move products between shard layouts")
+    parser.add_argument("--source", action="append", required=True, help="current shard URL (repeat, in order)")
+    parser.add_argument("--target", action="append", required=True, help="new shard URL (repeat, in order)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        moved = reshard(args.source, args.target, batch_size=args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info("Done: %s", moved)
+    logger.info("Set SHARD_DATABASE_URLS=%s", ",".join(args.target))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Generation Tracking Product Repository
+Decorates any ProductRepository and bumps the catalog generation
+after every successful write, invalidating cached listings
+"""
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from domain.entities.product import Product
+from domain.repositories.product_repository import ProductRepository
+from infrastructure.cache.listing_cache import CatalogGeneration
+
+
+class GenerationTrackingProductRepository(ProductRepository):
+    """
+    ProductRepository decorator that bumps CatalogGeneration on writes
+    Reads are delegated unchanged
+    """
+
+    def __init__(self, repository: ProductRepository, generation: CatalogGeneration):
+        """
+        Initialize with the wrapped repository and the shared generation counter
+        """
+        self._repository = repository
+        self._generation = generation
+
+    def save(self, product: Product) -> Product:
+        """
+        Save or update a product, then invalidate listings
+        """
+        saved_product = self._repository.save(product)
+        self._generation.bump()
+        return saved_product
+
+    def get_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get product by ID
+        """
+        return self._repository.get_by_id(product_id)
+
+    def get_many(self, product_ids: Sequence[UUID]) -> List[Product]:
+        """
+        Get several products by ID
+        """
+        return self._repository.get_many(product_ids)
+
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
+        """
+        Get all products with pagination
+        """
+        return self._repository.get_all(skip=skip, limit=limit)
+
+    def get_all_after(self, after_id: Optional[UUID] = None, limit: int = 100) -> List[Product]:
+        """
+        Get the next page of products ordered by ID
+        """
+        return self._repository.get_all_after(after_id, limit)
+
+    def delete(self, product_id: UUID) -> bool:
+        """
+        Delete a product, then invalidate listings if something was deleted
+        """
+        deleted = self._repository.delete(product_id)
+        if deleted:
+            self._generation.bump()
+        return deleted
+
+    def exists(self, product_id: UUID) -> bool:
+        """
+        Check if product exists
+        """
+        return self._repository.exists(product_id)
+
+    def get_archived_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get a deleted product by ID
+        """
+        return self._repository.get_archived_by_id(product_id)
@@ -0,0 +1,270 @@
+"""
+In-Memory Product Repository Implementation
+Implements ProductRepository interface without a database
+Used for benchmarks, tests and read-only edge nodes
+
+Export a snapshot of the primary catalog (loaded through PRODUCT_SNAPSHOT_PATH):
+    python -m infrastructure.repositories.in_memory_product_repository export catalog.jsonl
+"""
+import argparse
+import json
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import replace
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from domain.entities.product import Product
+from domain.exceptions.product_exceptions import ConcurrencyConflictError
+from domain.repositories.product_repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryProductRepository(ProductRepository):
+    """
+    Thread-safe in-memory implementation of ProductRepository
+    Keeps product IDs in sorted order (the listing order of
+    MySQLProductRepository) so pages are sliced without scanning the catalog
+    Only live products are loaded, refreshed and exported: products deleted
+    through this instance stay archived until the next catalog replacement
+    """
+
+    def __init__(self, products: Iterable[Product] = ()):
+        """
+        Initialize repository, optionally with an initial set of products
+        """
+        self._lock = threading.RLock()
+        self._products: Dict[UUID, Product] = {}
+        self._ids: List[str] = []
+        # Deleted products, kept out of the listing index
+        self._archived: Dict[UUID, Product] = {}
+        self.replace_all(products)
+
+    def save(self, product: Product) -> Product:
+        """
+        Save or update a product
+        Applies the same version check as the MySQL implementation
+        """
+        with self._lock:
+            current = self._products.get(product.id)
+
+            if current is not None:
+                if current.version != product.version:
+                    raise ConcurrencyConflictError(product.id, product.version)
+                self._unindex(current)
+                stored = replace(product, version=product.version + 1)
+            elif product.id in self._archived:
+                raise ConcurrencyConflictError(product.id, product.version)
+            else:
+                stored = replace(product)
+
+            self._index(stored)
+            return replace(stored)
+
+    def get_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get product by ID
+        """
+        with self._lock:
+            product = self._products.get(product_id)
+            return replace(product) if product else None
+
+    def get_many(self, product_ids: Sequence[UUID]) -> List[Product]:
+        """
+        Get several products by ID
+        """
+        with self._lock:
+            products = {
+                product_id: self._products[product_id]
+                for product_id in product_ids
+                if product_id in self._products
+            }
+            return [replace(products.pop(product_id)) for product_id in product_ids if product_id in products]
+
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
+        """
+        Get all products with pagination, ordered by ID
+        """
+        with self._lock:
+            ids = self._ids[skip:skip + limit]
+            return [replace(self._products[UUID(product_id)]) for product_id in ids]
+
+    def get_all_after(self, after_id: Optional[UUID] = None, limit: int = 100) -> List[Product]:
+        """
+        Get the next page of products ordered by ID
+        """
+        with self._lock:
+            start = 0 if after_id is None else bisect_right(self._ids, str(after_id))
+            ids = self._ids[start:start + limit]
+            return [replace(self._products[UUID(product_id)]) for product_id in ids]
+
+    def delete(self, product_id: UUID) -> bool:
+        """
+        Delete a product by ID
+        The product is dropped from all indexes and kept in the archive
+        """
+        with self._lock:
+            product = self._products.get(product_id)
+            if product is None:
+                return False
+
+            self._unindex(product)
+            self._archived[product_id] = replace(
+                product, version=product.version + 1, deleted_at=datetime.utcnow()
+            )
+            return True
+
+    def exists(self, product_id: UUID) -> bool:
+        """
+        Check if product exists
+        """
+        with self._lock:
+            return product_id in self._products
+
+    def get_archived_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get a deleted product by ID
+        """
+        with self._lock:
+            product = self._archived.get(product_id)
+            return replace(product) if product else None
+
+    def replace_all(self, products: Iterable[Product]) -> None:
+        """
+        Atomically replace the whole catalog and rebuild indexes
+        The archive is cleared: the new catalog supersedes local deletes
+        """
+        products_by_id = {product.id: replace(product) for product in products}
+        ids = sorted(str(product_id) for product_id in products_by_id)
+
+        with self._lock:
+            self._products = products_by_id
+            self._ids = ids
+            self._archived = {}
+
+    def refresh_from(self, source: ProductRepository, batch_size: int = 1000) -> int:
+        """
+        Reload the whole catalog from another repository (e.g. the primary database)
+        Pages by ID, so products deleted on the source meanwhile do not shift
+        later products out of the copy
+        Readers keep seeing the previous catalog until the new one is complete
+        Returns the number of products loaded
+        """
+        products: List[Product] = []
+        while True:
+            batch = source.get_all_after(products[-1].id if products else None, batch_size)
+            products.extend(batch)
+            if len(batch) < batch_size:
+                break
+
+        self.replace_all(products)
+        return len(products)
+
+    def load_snapshot(self, path: str) -> int:
+        """
+        Replace the catalog with the products in a snapshot file
+        The file holds one JSON product per line, as written by export_snapshot
+        Returns the number of products loaded
+        """
+        with open(path, "r", encoding="utf-8") as snapshot:
+            products = [_from_record(json.loads(line)) for line in snapshot if line.strip()]
+
+        self.replace_all(products)
+        return len(products)
+
+    def export_snapshot(self, path: str) -> int:
+        """
+        Write the catalog to a snapshot file, one JSON product per line
+        Returns the number of products written
+        """
+        with self._lock:
+            products = [self._products[UUID(product_id)] for product_id in self._ids]
+
+        with open(path, "w", encoding="utf-8") as snapshot:
+            for product in products:
+                snapshot.write(json.dumps(_to_record(product)) + "\n")
+
+        return len(products)
+
+    def _index(self, product: Product) -> None:
+        """
+        Store product and add it to the listing index
+        Caller must hold the lock
+        """
+        self._products[product.id] = product
+        insort(self._ids, str(product.id))
+
+    def _unindex(self, product: Product) -> None:
+        """
+        Remove product and its listing index entry
+        Caller must hold the lock
+        """
+        del self._products[product.id]
+        _remove_sorted(self._ids, str(product.id))
+
+
+def _remove_sorted(entries: list, value) -> None:
+    """
+    Remove value from a sorted list using binary search
+    """
+    position = bisect_left(entries, value)
+    if position < len(entries) and entries[position] == value:
+        del entries[position]
+
+
+def _to_record(product: Product) -> dict:
+    """
+    Convert product to a JSON-serializable snapshot record
+    """
+    return {
+        "id": str(product.id),
+        "name": product.name,
+        "description": product.description,
+        "price": str(product.price),
+        "stock_quantity": product.stock_quantity,
+        "created_at": product.created_at.isoformat(),
+        "updated_at": product.updated_at.isoformat(),
+        "version": product.version,
+    }
+
+
+def _from_record(record: dict) -> Product:
+    """
+    Convert a snapshot record back to a product
+    """
+    return Product(
+        id=UUID(record["id"]),
+        name=record["name"],
+        description=record.get("description"),
+        price=Decimal(record["price"]),
+        stock_quantity=int(record["stock_quantity"]),
+        created_at=datetime.fromisoformat(record["created_at"]),
+        updated_at=datetime.fromisoformat(record["updated_at"]),
+        version=int(record.get("version", 1)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory product catalog snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write the primary catalog to a snapshot file")
+    export.add_argument("path", help="snapshot file, as read through PRODUCT_SNAPSHOT_PATH")
+    export.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Imported here: the repository itself does not depend on a database
+    from infrastructure.repositories.primary_product_repository import primary_product_repository
+
+    logging.basicConfig(level=logging.INFO)
+    catalog = InMemoryProductRepository()
+    with primary_product_repository() as source:
+        catalog.refresh_from(source, batch_size=args.batch_size)
+    logger.info("Exported %d products to %s", catalog.export_snapshot(args.path), args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Primary Product Repository
+Opens the database(s) holding the authoritative catalog, for tools and
+nodes that copy it (snapshot export, in-memory refresh)
+"""
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from domain.repositories.product_repository import ProductRepository
+from infrastructure.database.config import SessionLocal, ShardSessionLocals, settings
+from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+from infrastructure.repositories.sharded_product_repository import ShardedProductRepository
+
+
+@contextmanager
+def primary_product_repository(executor: Optional[Executor] = None) -> Iterator[ProductRepository]:
+    """
+    Repository of the primary catalog
+    The shards of SHARD_DATABASE_URLS when set (sharded nodes, and edge nodes
+    copying a sharded primary), DATABASE_URL otherwise
+    Shards are read in parallel on executor (a temporary pool if None);
+    sessions are closed on exit
+    """
+    if not ShardSessionLocals:
+        db = SessionLocal()
+        try:
+            yield MySQLProductRepository(db)
+        finally:
+            db.close()
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(
+            max_workers=min(settings.SHARD_FANOUT_WORKERS, len(ShardSessionLocals)),
+            thread_name_prefix="shard-fanout",
+        )
+    dbs = [session_factory() for session_factory in ShardSessionLocals]
+    try:
+        yield ShardedProductRepository([MySQLProductRepository(db) for db in dbs], executor)
+    finally:
+        for db in dbs:
+            db.close()
+        if own_executor:
+            executor.shutdown()
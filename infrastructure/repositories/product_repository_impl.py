@@ -2,13 +2,15 @@
 Product Repository Implementation
 Implements ProductRepository interface from domain layer
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence
 from uuid import UUID
 from sqlalchemy.orm import Session
 
 from domain.entities.product import Product
+from domain.exceptions.product_exceptions import ConcurrencyConflictError
 from domain.repositories.product_repository import ProductRepository
-from infrastructure.database.models import ProductModel
+from infrastructure.database.models import ProductArchiveModel, ProductModel
 
 
 class MySQLProductRepository(ProductRepository):
@@ -26,26 +28,40 @@ class MySQLProductRepository(ProductRepository):
     def save(self, product: Product) -> Product:
         """
         Save or update a product
+        Updates are applied as UPDATE ... WHERE id = :id AND version = :version
+        so concurrent writers never silently overwrite each other
         """
-        # Check if product exists
-        product_model = self._session.query(ProductModel).filter(
-            ProductModel.id == str(product.id)
-        ).first()
+        # Compare-and-set update of an existing product
+        updated = self._session.query(ProductModel).filter(
+            ProductModel.id == str(product.id),
+            ProductModel.version == product.version,
+            ProductModel.deleted_at.is_(None)
+        ).update(
+            {
+                ProductModel.name: product.name,
+                ProductModel.description: product.description,
+                ProductModel.price: product.price,
+                ProductModel.stock_quantity: product.stock_quantity,
+                ProductModel.updated_at: product.updated_at,
+                ProductModel.version: ProductModel.version + 1,
+            },
+            synchronize_session=False
+        )
+
+        if not updated:
+            if self._id_taken(product.id):
+                # Row changed, was deleted or archived: somebody else won the race
+                self._session.rollback()
+                raise ConcurrencyConflictError(product.id, product.version)
 
-        if product_model:
-            # Update existing product
-            product_model.name = product.name
-            product_model.description = product.description
-            product_model.price = product.price
-            product_model.stock_quantity = product.stock_quantity
-            product_model.updated_at = product.updated_at
-        else:
             # Create new product
-            product_model = ProductModel.from_domain_entity(product)
-            self._session.add(product_model)
+            self._session.add(ProductModel.from_domain_entity(product))
 
         self._session.commit()
-        self._session.refresh(product_model)
+
+        product_model = self._session.query(ProductModel).filter(
+            ProductModel.id == str(product.id)
+        ).first()
 
         # Return domain entity
         return product_model.to_domain_entity()
@@ -55,7 +71,8 @@ class MySQLProductRepository(ProductRepository):
         Get product by ID
         """
         product_model = self._session.query(ProductModel).filter(
-            ProductModel.id == str(product_id)
+            ProductModel.id == str(product_id),
+            ProductModel.deleted_at.is_(None)
         ).first()
 
         if not product_model:
@@ -63,33 +80,98 @@ class MySQLProductRepository(ProductRepository):
 
         return product_model.to_domain_entity()
 
+    def get_many(self, product_ids: Sequence[UUID]) -> List[Product]:
+        """
+        Get several products by ID with a single IN query
+        """
+        if not product_ids:
+            return []
+
+        product_models = self._session.query(ProductModel).filter(
+            ProductModel.id.in_({str(product_id) for product_id in product_ids}),
+            ProductModel.deleted_at.is_(None)
+        ).all()
+        products = {UUID(model.id): model.to_domain_entity() for model in product_models}
+        return [products.pop(product_id) for product_id in product_ids if product_id in products]
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
         """
         Get all products with pagination
+        Ordered by primary key so pages are stable between requests
         """
-        product_models = self._session.query(ProductModel).offset(skip).limit(limit).all()
+        product_models = self._session.query(ProductModel).filter(
+            ProductModel.deleted_at.is_(None)
+        ).order_by(
+            ProductModel.id
+        ).offset(skip).limit(limit).all()
         return [model.to_domain_entity() for model in product_models]
 
-    def delete(self, product_id: UUID) -> bool:
+    def get_all_after(self, after_id: Optional[UUID] = None, limit: int = 100) -> List[Product]:
         """
-        Delete a product by ID
+        Get the next page of products ordered by ID
+        Seeks on the primary key instead of scanning skipped rows
         """
-        product_model = self._session.query(ProductModel).filter(
-            ProductModel.id == str(product_id)
-        ).first()
-
-        if not product_model:
-            return False
+        query = self._session.query(ProductModel).filter(
+            ProductModel.deleted_at.is_(None)
+        )
+        if after_id is not None:
+            query = query.filter(ProductModel.id > str(after_id))
+        product_models = query.order_by(ProductModel.id).limit(limit).all()
+        return [model.to_domain_entity() for model in product_models]
 
-        self._session.delete(product_model)
+    def delete(self, product_id: UUID) -> bool:
+        """
+        Soft-delete a product by ID
+        The row stays in the hot table until ProductArchiver moves it
+        """
+        deleted = self._session.query(ProductModel).filter(
+            ProductModel.id == str(product_id),
+            ProductModel.deleted_at.is_(None)
+        ).update(
+            {
+                ProductModel.deleted_at: datetime.utcnow(),
+                ProductModel.version: ProductModel.version + 1,
+            },
+            synchronize_session=False
+        )
         self._session.commit()
-        return True
+        return deleted > 0
 
     def exists(self, product_id: UUID) -> bool:
         """
         Check if product exists
         """
         count = self._session.query(ProductModel).filter(
-            ProductModel.id == str(product_id)
+            ProductModel.id == str(product_id),
+            ProductModel.deleted_at.is_(None)
         ).count()
         return count > 0
+
+    def get_archived_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get a deleted product by ID
+        Looks at soft-deleted hot rows first, then the archive table
+        """
+        product_model = self._session.query(ProductModel).filter(
+            ProductModel.id == str(product_id),
+            ProductModel.deleted_at.isnot(None)
+        ).first()
+        if product_model:
+            return product_model.to_domain_entity()
+
+        archive_model = self._session.query(ProductArchiveModel).filter(
+            ProductArchiveModel.id == str(product_id)
+        ).first()
+        if archive_model:
+            return archive_model.to_domain_entity()
+
+        return None
+
+    def _id_taken(self, product_id: UUID) -> bool:
+        """
+        Check if the ID is used by any row, deleted or archived included
+        """
+        for model in (ProductModel, ProductArchiveModel):
+            if self._session.query(model.id).filter(model.id == str(product_id)).first():
+                return True
+        return False
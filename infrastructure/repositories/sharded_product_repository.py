@@ -0,0 +1,139 @@
+"""
+Sharded Product Repository Implementation
+Implements ProductRepository interface on top of several shard repositories,
+routing each product to a shard by a hash of its ID
+"""
+import hashlib
+import heapq
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from domain.entities.product import Product
+from domain.repositories.product_repository import ProductRepository
+
+
+def shard_index(product_id: UUID, shard_count: int) -> int:
+    """
+    Shard number owning a product
+    Stable across processes and Python versions (does not use hash())
+    """
+    digest = hashlib.blake2b(product_id.bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+class ShardedProductRepository(ProductRepository):
+    """
+    Hash-sharded implementation of ProductRepository
+    Single-product operations go straight to the owning shard;
+    batch lookups query only the shards owning the requested IDs;
+    listings query every shard in parallel and merge by ID
+    """
+
+    def __init__(self, shards: Sequence[ProductRepository], executor: Executor):
+        """
+        Initialize with one repository per shard (in shard order)
+        and the executor used to query shards in parallel
+        """
+        if not shards:
+            raise ValueError("At least one shard is required")
+
+        self._shards = list(shards)
+        self._executor = executor
+
+    def shard_for(self, product_id: UUID) -> ProductRepository:
+        """
+        Repository of the shard owning this product
+        """
+        return self._shards[shard_index(product_id, len(self._shards))]
+
+    def save(self, product: Product) -> Product:
+        """
+        Save or update a product on its shard
+        """
+        return self.shard_for(product.id).save(product)
+
+    def get_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get product by ID from its shard
+        """
+        return self.shard_for(product_id).get_by_id(product_id)
+
+    def get_many(self, product_ids: Sequence[UUID]) -> List[Product]:
+        """
+        Get several products by ID
+        IDs are grouped by owning shard and each shard is queried once, in parallel
+        """
+        ids_by_shard: Dict[int, List[UUID]] = {}
+        for product_id in product_ids:
+            ids_by_shard.setdefault(shard_index(product_id, len(self._shards)), []).append(product_id)
+
+        if len(ids_by_shard) <= 1:
+            shard_results = [self._shards[index].get_many(ids) for index, ids in ids_by_shard.items()]
+        else:
+            futures = [
+                self._executor.submit(self._shards[index].get_many, ids)
+                for index, ids in ids_by_shard.items()
+            ]
+            shard_results = [future.result() for future in futures]
+
+        products = {product.id: product for result in shard_results for product in result}
+        return [products.pop(product_id) for product_id in product_ids if product_id in products]
+
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
+        """
+        Get all products with pagination, ordered by ID across all shards
+        Each shard returns its first skip + limit products; the sorted
+        results are merged and the requested page is cut from the merge
+        Cost grows with skip, so callers must bound it (the API caps it
+        at LISTING_MAX_SKIP)
+        """
+        window = skip + limit
+        if len(self._shards) == 1:
+            return self._shards[0].get_all(skip=skip, limit=limit)
+
+        futures = [
+            self._executor.submit(shard.get_all, 0, window)
+            for shard in self._shards
+        ]
+        shard_pages = [future.result() for future in futures]
+
+        merged = heapq.merge(*shard_pages, key=lambda product: str(product.id))
+        return list(islice(merged, skip, window))
+
+    def get_all_after(self, after_id: Optional[UUID] = None, limit: int = 100) -> List[Product]:
+        """
+        Get the next page of products ordered by ID across all shards
+        Every shard seeks past after_id in parallel and returns at most
+        limit products, whatever the page depth
+        """
+        if len(self._shards) == 1:
+            return self._shards[0].get_all_after(after_id, limit)
+
+        futures = [
+            self._executor.submit(shard.get_all_after, after_id, limit)
+            for shard in self._shards
+        ]
+        shard_pages = [future.result() for future in futures]
+
+        merged = heapq.merge(*shard_pages, key=lambda product: str(product.id))
+        return list(islice(merged, limit))
+
+    def delete(self, product_id: UUID) -> bool:
+        """
+        Delete a product on its shard
+        """
+        return self.shard_for(product_id).delete(product_id)
+
+    def exists(self, product_id: UUID) -> bool:
+        """
+        Check if product exists on its shard
+        """
+        return self.shard_for(product_id).exists(product_id)
+
+    def get_archived_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Get a deleted product by ID from its shard
+        """
+        return self.shard_for(product_id).get_archived_by_id(product_id)
@@ -2,14 +2,43 @@
 FastAPI Application Entry Point
 Main application setup and routing
 """
+import logging
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from infrastructure.api.controllers.product_controller import router as product_router
-from infrastructure.database.config import engine, Base
+from infrastructure.api.controllers.product_controller import (
+    catalog_generation,
+    in_memory_repository,
+    listing_cache,
+    router as product_router,
+    shard_executor,
+)
+from infrastructure.api.middleware.concurrency_limiter import (
+    ConcurrencyLimiter,
+    ConcurrencyLimitMiddleware,
+    RouteClassLimiter,
+)
+from infrastructure.database.archival import create_archiver, run_archiver_periodically
+from infrastructure.database.config import (
+    engine,
+    Base,
+    SessionLocal,
+    ShardSessionLocals,
+    settings,
+    shard_engines,
+)
+from infrastructure.repositories.primary_product_repository import primary_product_repository
+
+logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables (in-memory nodes do not own a database)
+if settings.PRODUCT_REPOSITORY_BACKEND == "sharded":
+    for shard_engine in shard_engines:
+        Base.metadata.create_all(bind=shard_engine)
+elif settings.PRODUCT_REPOSITORY_BACKEND != "memory":
+    Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,7 +47,30 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configure CORS
+# Configure overload protection for DB-bound routes
+concurrency_limiter = ConcurrencyLimiter(
+    {
+        route_class: RouteClassLimiter(
+            route_class,
+            max_limit=budget,
+            max_queue=settings.CONCURRENCY_QUEUE_SIZE,
+            queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT,
+            target_latency=settings.CONCURRENCY_TARGET_LATENCY,
+        )
+        for route_class, budget in {
+            "read": settings.CONCURRENCY_LIMIT_READ,
+            "bulk": settings.CONCURRENCY_LIMIT_BULK,
+            "stock": settings.CONCURRENCY_LIMIT_STOCK,
+            "write": settings.CONCURRENCY_LIMIT_WRITE,
+        }.items()
+    },
+    retry_after=settings.CONCURRENCY_RETRY_AFTER,
+)
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    # Listing cache hits skip the bulk budget: the endpoint only takes a slot on a miss
+    app.add_middleware(ConcurrencyLimitMiddleware, limiter=concurrency_limiter, deferred=("bulk",))
+
+# Configure CORS (outermost, so shed responses still carry CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,6 +83,85 @@ app.add_middleware(
 app.include_router(product_router, prefix="/api")
 
 
+def refresh_in_memory_repository() -> None:
+    """
+    Reload the in-memory catalog from the primary database (or its shards)
+    """
+    with primary_product_repository(shard_executor) as primary:
+        count = in_memory_repository.refresh_from(primary)
+    catalog_generation.bump()
+    logger.info("Refreshed in-memory product repository: %d products", count)
+
+
+def refresh_in_memory_repository_periodically(stop: threading.Event) -> None:
+    """
+    Background loop refreshing the in-memory catalog every PRODUCT_REFRESH_SECONDS
+    """
+    while not stop.wait(settings.PRODUCT_REFRESH_SECONDS):
+        try:
+            refresh_in_memory_repository()
+        except Exception:
+            logger.exception("Failed to refresh in-memory product repository")
+
+
+background_stop = threading.Event()
+
+
+@app.on_event("startup")
+def load_in_memory_repository():
+    """
+    Populate the in-memory repository from the snapshot file and/or primary database
+    """
+    if settings.PRODUCT_REPOSITORY_BACKEND != "memory":
+        return
+
+    if settings.PRODUCT_SNAPSHOT_PATH:
+        count = in_memory_repository.load_snapshot(settings.PRODUCT_SNAPSHOT_PATH)
+        catalog_generation.bump()
+        logger.info("Loaded %d products from %s", count, settings.PRODUCT_SNAPSHOT_PATH)
+
+    if settings.PRODUCT_REFRESH_SECONDS > 0:
+        if not settings.PRODUCT_SNAPSHOT_PATH:
+            refresh_in_memory_repository()
+        threading.Thread(
+            target=refresh_in_memory_repository_periodically,
+            args=(background_stop,),
+            name="product-repository-refresh",
+            daemon=True,
+        ).start()
+
+
+@app.on_event("startup")
+def start_archiver():
+    """
+    Periodically move deleted products out of the hot products table
+    Off by default: each worker would run its own loop, see ARCHIVE_INTERVAL_SECONDS
+    """
+    if settings.PRODUCT_REPOSITORY_BACKEND == "memory" or settings.ARCHIVE_INTERVAL_SECONDS <= 0:
+        return
+
+    if settings.PRODUCT_REPOSITORY_BACKEND == "sharded":
+        session_factories = ShardSessionLocals
+    else:
+        session_factories = [SessionLocal]
+
+    for index, session_factory in enumerate(session_factories):
+        threading.Thread(
+            target=run_archiver_periodically,
+            args=(create_archiver(session_factory), settings.ARCHIVE_INTERVAL_SECONDS, background_stop),
+            name=f"product-archiver-{index}",
+            daemon=True,
+        ).start()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    """
+    Stop the background refresh and archival loops
+    """
+    background_stop.set()
+
+
 @app.get("/")
 def root():
     """
@@ -44,8 +175,26 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint
+    Runs on the event loop (not the threadpool) and is never rate limited,
+    so it keeps answering while DB-bound routes are overloaded
     """
     return {"status": "healthy"}
+
+
+@app.get("/metrics/concurrency")
+async def concurrency_metrics():
+    """
+    Concurrency limiter state per route class (this worker process only)
+    """
+    return concurrency_limiter.metrics()
+
+
+@app.get("/metrics/listing-cache")
+async def listing_cache_metrics():
+    """
+    Listing cache size and hit/miss counters (this worker process only)
+    """
+    return listing_cache.metrics()
@@ -0,0 +1,60 @@
+"""
+Shared pytest fixtures
+Tests run against SQLite databases instead of MySQL
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Settings are read at import time: point them at SQLite before anything imports config
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ARCHIVE_INTERVAL_SECONDS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from infrastructure.database.config import Base
+import infrastructure.database.models  # noqa: F401  (registers tables on Base)
+
+
+def create_sqlite_session_factory(path) -> sessionmaker:
+    """
+    Create a SQLite database file with all tables and return its session factory
+    Sessions may be used from other threads (shard fan-out)
+    """
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def session_factory(tmp_path) -> sessionmaker:
+    """
+    Session factory of a fresh SQLite database
+    """
+    factory = create_sqlite_session_factory(tmp_path / "products.db")
+    yield factory
+    factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def shard_session_factories(tmp_path) -> list:
+    """
+    Session factories of three fresh SQLite databases used as shards
+    """
+    factories = [create_sqlite_session_factory(tmp_path / f"shard_{index}.db") for index in range(3)]
+    yield factories
+    for factory in factories:
+        factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def shard_executor() -> ThreadPoolExecutor:
+    """
+    Executor for querying shards in parallel
+    """
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
@@ -0,0 +1,64 @@
+"""
+Tests for moving deleted products to products_archive
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from domain.entities.product import Product
+from domain.exceptions.product_exceptions import ConcurrencyConflictError
+from infrastructure.database.archival import ProductArchiver
+from infrastructure.database.models import ProductArchiveModel, ProductModel
+from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+
+
+def make_product(name: str) -> Product:
+    return Product.create(name=name, description=None, price=Decimal("10.00"), stock_quantity=5)
+
+
+def count(session_factory, model) -> int:
+    session = session_factory()
+    try:
+        return session.query(model).count()
+    finally:
+        session.close()
+
+
+def test_archiver_moves_deleted_products_in_batches(session_factory):
+    session = session_factory()
+    repository = MySQLProductRepository(session)
+    deleted = [repository.save(make_product(f"old{i}")) for i in range(5)]
+    live = repository.save(make_product("live"))
+    for product in deleted:
+        repository.delete(product.id)
+
+    archiver = ProductArchiver(session_factory, batch_size=2, grace_period=timedelta(0), pause_seconds=0)
+
+    assert archiver.run() == 5
+    assert count(session_factory, ProductModel) == 1
+    assert count(session_factory, ProductArchiveModel) == 5
+    assert archiver.run() == 0
+
+    session.expire_all()
+    archived = repository.get_archived_by_id(deleted[0].id)
+    assert archived.name == "old0"
+    assert archived.version == 2
+    assert archived.deleted_at is not None
+    assert repository.get_by_id(live.id).name == "live"
+    with pytest.raises(ConcurrencyConflictError):
+        repository.save(deleted[0])
+    session.close()
+
+
+def test_archiver_keeps_products_within_grace_period(session_factory):
+    session = session_factory()
+    repository = MySQLProductRepository(session)
+    repository.delete(repository.save(make_product("recent")).id)
+    session.close()
+
+    archiver = ProductArchiver(session_factory, grace_period=timedelta(hours=1), pause_seconds=0)
+
+    assert archiver.run() == 0
+    assert count(session_factory, ProductModel) == 1
+    assert count(session_factory, ProductArchiveModel) == 0
@@ -0,0 +1,125 @@
+"""
+Tests for the adaptive per-route-class concurrency limiter
+"""
+import asyncio
+
+import pytest
+
+from infrastructure.api.middleware.concurrency_limiter import RouteClassLimiter, classify_product_route
+
+
+def make_limiter(max_limit: int = 2, max_queue: int = 4, queue_timeout: float = 0.05) -> RouteClassLimiter:
+    return RouteClassLimiter(
+        name="bulk",
+        max_limit=max_limit,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        target_latency=0.5
+    )
+
+
+def run_batch(limiter: RouteClassLimiter, latency: float) -> None:
+    """
+    Fill the whole budget, then complete every request with the given latency
+    """
+    async def batch():
+        slots = limiter.effective_limit
+        for _ in range(slots):
+            assert await limiter.acquire()
+        for _ in range(slots):
+            limiter.release(latency)
+
+    asyncio.run(batch())
+
+
+def test_small_budget_holds_under_normal_latency():
+    limiter = make_limiter(max_limit=2)
+
+    for _ in range(50):
+        run_batch(limiter, 0.1)
+
+    assert limiter.effective_limit == 2
+
+
+def test_single_slow_sample_does_not_back_off():
+    limiter = make_limiter(max_limit=2)
+    run_batch(limiter, 0.1)
+
+    async def one_slow_request():
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        limiter.release(2.0)
+        limiter.release(0.1)
+
+    asyncio.run(one_slow_request())
+
+    assert limiter.effective_limit == 2
+    assert limiter.limit == 2.0
+
+
+def test_one_backoff_step_rounds_instead_of_truncating():
+    limiter = make_limiter(max_limit=3)
+    limiter.limit = 3 * RouteClassLimiter.BACKOFF_RATIO
+
+    assert limiter.effective_limit == 3
+
+
+def test_sustained_slowness_backs_off_and_recovers():
+    limiter = make_limiter(max_limit=4)
+
+    for _ in range(20):
+        limiter._last_backoff = 0.0
+        run_batch(limiter, 2.0)
+    assert limiter.effective_limit == 1
+
+    for _ in range(200):
+        run_batch(limiter, 0.01)
+    assert limiter.effective_limit == 4
+
+
+def test_waiter_is_admitted_on_release():
+    limiter = make_limiter(max_limit=1)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(0.01)
+        return await waiting
+
+    assert asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert limiter.queued == 1
+
+
+def test_queue_deadline_and_full_queue_shed():
+    limiter = make_limiter(max_limit=1, max_queue=1, queue_timeout=0.01)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        overflow = await limiter.acquire()
+        return overflow, await waiting
+
+    overflow, waited = asyncio.run(scenario())
+
+    assert not overflow
+    assert not waited
+    assert limiter.shed == 1
+    assert limiter.timed_out == 1
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.parametrize("method,path,route_class", [
+    ("GET", "/api/products", "bulk"),
+    ("GET", "/api/products/", "bulk"),
+    ("GET", "/api/products/batch", "bulk"),
+    ("GET", "/api/products/5b0c6f1e-0000-4000-8000-000000000000", "read"),
+    ("GET", "/api/products/archive/5b0c6f1e-0000-4000-8000-000000000000", "read"),
+    ("PUT", "/api/products/5b0c6f1e-0000-4000-8000-000000000000", "write"),
+    ("POST", "/api/products/5b0c6f1e-0000-4000-8000-000000000000/stock/reduce", "stock"),
+    ("GET", "/health", None),
+])
+def test_route_classes(method, path, route_class):
+    assert classify_product_route(method, path) == route_class
@@ -0,0 +1,133 @@
+"""
+Tests for the generation-keyed listing cache
+"""
+import threading
+import time
+
+import pytest
+
+from infrastructure.cache import listing_cache as listing_cache_module
+from infrastructure.cache.listing_cache import CatalogGeneration, ListingCache
+
+
+class Builder:
+    """
+    Build function counting its calls
+    """
+
+    def __init__(self, body: bytes = b"[]"):
+        self.body = body
+        self.calls = 0
+
+    def __call__(self) -> bytes:
+        self.calls += 1
+        return self.body
+
+
+@pytest.fixture
+def generation() -> CatalogGeneration:
+    return CatalogGeneration()
+
+
+def test_second_request_is_a_hit(generation):
+    cache = ListingCache(generation)
+    build = Builder(b"page")
+
+    assert cache.get((0, 10)) is None
+    assert cache.get_or_build((0, 10), build) == b"page"
+    assert cache.get_or_build((0, 10), build) == b"page"
+    assert cache.get((0, 10)) == b"page"
+
+    assert build.calls == 1
+    assert cache.metrics()["hits"] == 2
+    assert cache.metrics()["misses"] == 1
+
+
+def test_generation_bump_invalidates(generation):
+    cache = ListingCache(generation)
+    cache.get_or_build((0, 10), Builder(b"old"))
+
+    generation.bump()
+
+    assert cache.get((0, 10)) is None
+    assert cache.get_or_build((0, 10), Builder(b"new")) == b"new"
+    assert cache.metrics()["entries"] == 1
+
+
+def test_result_built_before_a_write_is_not_cached(generation):
+    cache = ListingCache(generation)
+
+    def build_during_write() -> bytes:
+        generation.bump()
+        return b"stale"
+
+    assert cache.get_or_build((0, 10), build_during_write) == b"stale"
+    assert cache.get((0, 10)) is None
+
+
+def test_entries_expire_after_max_age(generation, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(listing_cache_module.time, "monotonic", lambda: now[0])
+    cache = ListingCache(generation, max_age=5)
+    cache.get_or_build((0, 10), Builder(b"page"))
+
+    now[0] += 4
+    assert cache.get((0, 10)) == b"page"
+
+    now[0] += 2
+    assert cache.get((0, 10)) is None
+    assert cache.metrics()["entries"] == 0
+    assert cache.metrics()["bytes"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(generation):
+    cache = ListingCache(generation, max_entries=2, max_bytes=10)
+    cache.get_or_build("a", Builder(b"aaaa"))
+    cache.get_or_build("b", Builder(b"bbbb"))
+    cache.get("a")
+
+    cache.get_or_build("c", Builder(b"cccc"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+
+    cache.get_or_build("d", Builder(b"dddddddd"))
+    assert cache.metrics()["bytes"] <= 10
+    assert cache.get("d") == b"dddddddd"
+
+    cache.get_or_build("huge", Builder(b"x" * 11))
+    assert cache.get("huge") is None
+
+
+def test_concurrent_misses_share_one_build(generation):
+    cache = ListingCache(generation)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_build() -> bytes:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"page"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_build("k", slow_build)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_build("k", slow_build)))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    deadline = time.monotonic() + 5
+    while cache.metrics()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert results == [b"page"] * 4
+    assert len(calls) == 1
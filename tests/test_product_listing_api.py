@@ -0,0 +1,175 @@
+"""
+Tests for the product listing routes
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+import anyio.to_thread
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from application.dtos.product_dto import CreateProductDTO
+from application.services.product_service import ProductService
+from infrastructure.api.controllers.product_controller import (
+    catalog_generation,
+    get_product_service,
+    get_product_service_scope,
+)
+from infrastructure.database.config import settings
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+from main import app, concurrency_limiter
+
+
+@pytest.fixture
+def opened_scopes():
+    """
+    Serve listings from an in-memory catalog, counting opened service scopes
+    Each build takes build_delay[0] seconds
+    """
+    service = ProductService(InMemoryProductRepository())
+    for name in ("Keyboard", "Mouse"):
+        service.create_product(
+            CreateProductDTO(name=name, description=None, price=Decimal("10"), stock_quantity=5)
+        )
+    opened = []
+
+    @contextmanager
+    def scope():
+        opened.append(1)
+        time.sleep(build_delay[0])
+        yield service
+
+    async def provide_scope():
+        return scope
+
+    app.dependency_overrides[get_product_service_scope] = provide_scope
+    app.dependency_overrides[get_product_service] = lambda: service
+    catalog_generation.bump()
+    yield opened
+    app.dependency_overrides.clear()
+    build_delay[0] = 0.0
+
+
+build_delay = [0.0]
+
+
+@pytest.fixture
+def saturated_bulk_budget():
+    """
+    Leave a single free bulk slot and no queue
+    """
+    bulk = concurrency_limiter.limiters["bulk"]
+    max_queue = bulk.max_queue
+    bulk.in_flight = bulk.effective_limit - 1
+    bulk.max_queue = 0
+    yield bulk
+    bulk.in_flight, bulk.max_queue = 0, max_queue
+
+
+async def get_concurrently(url: str, count: int) -> list:
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(url) for _ in range(count)))
+
+
+def test_cache_hit_does_not_open_a_service_scope(opened_scopes):
+    client = TestClient(app)
+
+    first = client.get("/api/products?limit=10")
+    second = client.get("/api/products?limit=10")
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert sorted(product["name"] for product in first.json()) == ["Keyboard", "Mouse"]
+    assert len(opened_scopes) == 1
+
+
+def test_saturated_bulk_budget_sheds_misses_but_serves_hits(opened_scopes):
+    client = TestClient(app)
+    client.get("/api/products?limit=10")
+    bulk = concurrency_limiter.limiters["bulk"]
+    bulk.in_flight, max_queue = bulk.effective_limit, bulk.max_queue
+    bulk.max_queue = 0
+    try:
+        hit = client.get("/api/products?limit=10")
+        miss = client.get("/api/products?limit=20")
+    finally:
+        bulk.in_flight, bulk.max_queue = 0, max_queue
+
+    assert hit.status_code == 200
+    assert miss.status_code == 503
+    assert miss.headers["Retry-After"] == str(concurrency_limiter.retry_after)
+    assert len(opened_scopes) == 1
+
+
+def test_deep_pages_are_rejected(opened_scopes):
+    client = TestClient(app)
+
+    assert client.get(f"/api/products?skip={settings.LISTING_MAX_SKIP}").status_code == 200
+    assert client.get(f"/api/products?skip={settings.LISTING_MAX_SKIP + 1}").status_code == 422
+    assert client.get(f"/api/products?limit={settings.LISTING_MAX_LIMIT + 1}").status_code == 422
+    assert client.get("/api/products?limit=0").status_code == 422
+
+
+def test_batch_returns_products_in_requested_order(opened_scopes):
+    client = TestClient(app)
+    listed = client.get("/api/products").json()
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = client.get(
+        "/api/products/batch",
+        params={"ids": [listed[1]["id"], missing, listed[0]["id"]]}
+    )
+
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [listed[1]["id"], listed[0]["id"]]
+
+
+def test_concurrent_misses_share_one_build_and_one_slot(opened_scopes, saturated_bulk_budget):
+    build_delay[0] = 0.3
+    shed = saturated_bulk_budget.shed
+
+    responses = asyncio.run(get_concurrently("/api/products?limit=5", 20))
+
+    assert [response.status_code for response in responses] == [200] * 20
+    assert len(opened_scopes) == 1
+    assert saturated_bulk_budget.shed == shed
+
+
+def test_cache_hit_uses_no_worker_thread(opened_scopes, monkeypatch):
+    client = TestClient(app)
+    client.get("/api/products?limit=10")
+    # Resolve the real dependency from here on; hits never enter the scope
+    del app.dependency_overrides[get_product_service_scope]
+    run_sync = anyio.to_thread.run_sync
+    thread_calls = []
+
+    async def counting_run_sync(*args, **kwargs):
+        thread_calls.append(args[0])
+        return await run_sync(*args, **kwargs)
+
+    monkeypatch.setattr(anyio.to_thread, "run_sync", counting_run_sync)
+    responses = asyncio.run(get_concurrently("/api/products?limit=10", 3))
+
+    assert [response.status_code for response in responses] == [200] * 3
+    assert thread_calls == []
+
+
+def test_batch_lookup_takes_a_bulk_slot(opened_scopes, saturated_bulk_budget):
+    client = TestClient(app)
+    listed = client.get("/api/products").json()
+    url = f"/api/products/batch?ids={listed[0]['id']}"
+    admitted = saturated_bulk_budget.admitted
+
+    assert client.get(url).status_code == 200
+    assert saturated_bulk_budget.admitted == admitted + 1
+    assert saturated_bulk_budget.in_flight == saturated_bulk_budget.effective_limit - 1
+
+    saturated_bulk_budget.in_flight += 1
+    shed = client.get(url)
+    saturated_bulk_budget.in_flight -= 1
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == str(concurrency_limiter.retry_after)
@@ -0,0 +1,251 @@
+"""
+Contract tests for ProductRepository implementations
+Every implementation must pass the same suite
+"""
+from dataclasses import replace
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from domain.entities.product import Product
+from domain.exceptions.product_exceptions import ConcurrencyConflictError
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+from infrastructure.repositories.sharded_product_repository import ShardedProductRepository
+
+
+@pytest.fixture(params=["mysql", "memory", "sharded"])
+def repository(request, session_factory, shard_session_factories, shard_executor):
+    """
+    Repository under test
+    "mysql" is MySQLProductRepository on a SQLite session,
+    "sharded" spreads products over three SQLite databases
+    """
+    if request.param == "mysql":
+        session = session_factory()
+        yield MySQLProductRepository(session)
+        session.close()
+    elif request.param == "sharded":
+        sessions = [factory() for factory in shard_session_factories]
+        yield ShardedProductRepository(
+            [MySQLProductRepository(session) for session in sessions],
+            shard_executor,
+        )
+        for session in sessions:
+            session.close()
+    else:
+        yield InMemoryProductRepository()
+
+
+def make_product(name: str = "Keyboard", price: str = "10.00", stock: int = 5) -> Product:
+    return Product.create(name=name, description=None, price=Decimal(price), stock_quantity=stock)
+
+
+def key(product: Product) -> tuple:
+    return (product.id, product.name, product.price, product.stock_quantity, product.version)
+
+
+def test_save_creates_product(repository):
+    product = make_product()
+
+    saved = repository.save(product)
+
+    assert saved.id == product.id
+    assert saved.version == 1
+    assert key(repository.get_by_id(product.id)) == key(saved)
+
+
+def test_get_by_id_returns_none_when_missing(repository):
+    assert repository.get_by_id(uuid4()) is None
+
+
+def test_save_bumps_version(repository):
+    saved = repository.save(make_product())
+    saved.update_name("Mouse")
+
+    updated = repository.save(saved)
+
+    assert updated.version == 2
+    assert repository.get_by_id(saved.id).name == "Mouse"
+
+
+def test_save_with_stale_version_conflicts(repository):
+    saved = repository.save(make_product())
+    first = repository.get_by_id(saved.id)
+    second = repository.get_by_id(saved.id)
+    first.increase_stock(1)
+    repository.save(first)
+    second.increase_stock(2)
+
+    with pytest.raises(ConcurrencyConflictError):
+        repository.save(second)
+
+    assert repository.get_by_id(saved.id).stock_quantity == 6
+
+
+def test_returned_products_are_copies(repository):
+    saved = repository.save(make_product())
+    fetched = repository.get_by_id(saved.id)
+
+    fetched.update_name("Changed locally")
+
+    assert repository.get_by_id(saved.id).name == "Keyboard"
+
+
+def test_get_all_orders_by_id_and_pages(repository):
+    products = [repository.save(make_product(name=f"p{i}")) for i in range(12)]
+    expected = sorted(str(product.id) for product in products)
+
+    assert [str(p.id) for p in repository.get_all(skip=0, limit=100)] == expected
+    assert [str(p.id) for p in repository.get_all(skip=3, limit=4)] == expected[3:7]
+    assert [str(p.id) for p in repository.get_all(skip=10, limit=5)] == expected[10:]
+    assert repository.get_all(skip=12, limit=5) == []
+
+
+def test_get_many_keeps_requested_order(repository):
+    products = [repository.save(make_product(name=f"p{i}")) for i in range(6)]
+    deleted = products.pop()
+    repository.delete(deleted.id)
+    requested = [products[3].id, uuid4(), products[0].id, deleted.id, products[4].id, products[0].id]
+
+    found = repository.get_many(requested)
+
+    assert [p.id for p in found] == [products[3].id, products[0].id, products[4].id]
+    assert key(found[1]) == key(products[0])
+    assert repository.get_many([]) == []
+
+
+def test_delete_and_exists(repository):
+    saved = repository.save(make_product())
+
+    assert repository.exists(saved.id)
+    assert repository.delete(saved.id)
+    assert not repository.exists(saved.id)
+    assert repository.get_by_id(saved.id) is None
+    assert not repository.delete(saved.id)
+    assert repository.get_all() == []
+
+
+def test_snapshot_round_trip(repository, tmp_path):
+    for i in range(5):
+        repository.save(make_product(name=f"p{i}", price=f"{i + 1}.50", stock=i))
+    snapshot = tmp_path / "catalog.jsonl"
+
+    exported = InMemoryProductRepository()
+    exported.refresh_from(repository, batch_size=2)
+    assert exported.export_snapshot(str(snapshot)) == 5
+
+    loaded = InMemoryProductRepository()
+    assert loaded.load_snapshot(str(snapshot)) == 5
+    assert [key(p) for p in loaded.get_all()] == [key(p) for p in repository.get_all()]
+    assert [p.created_at for p in loaded.get_all()] == [p.created_at for p in repository.get_all()]
+
+
+def test_saving_product_loaded_from_snapshot_keeps_versioning(repository, tmp_path):
+    saved = repository.save(make_product())
+    saved.update_price(Decimal("12.00"))
+    repository.save(saved)
+    snapshot = tmp_path / "catalog.jsonl"
+    source = InMemoryProductRepository()
+    source.refresh_from(repository)
+    source.export_snapshot(str(snapshot))
+
+    loaded = InMemoryProductRepository()
+    loaded.load_snapshot(str(snapshot))
+    stale = replace(loaded.get_by_id(saved.id), version=1)
+
+    with pytest.raises(ConcurrencyConflictError):
+        loaded.save(stale)
+
+
+def test_deleted_product_is_found_in_archive(repository):
+    saved = repository.save(make_product())
+    kept = repository.save(make_product(name="Mouse"))
+
+    repository.delete(saved.id)
+
+    archived = repository.get_archived_by_id(saved.id)
+    assert archived.name == "Keyboard"
+    assert archived.version == 2
+    assert archived.deleted_at is not None
+    assert repository.get_archived_by_id(kept.id) is None
+    assert [p.id for p in repository.get_all()] == [kept.id]
+
+
+def test_saving_deleted_product_conflicts(repository):
+    saved = repository.save(make_product())
+    repository.delete(saved.id)
+
+    with pytest.raises(ConcurrencyConflictError):
+        repository.save(saved)
+
+    assert repository.get_by_id(saved.id) is None
+
+
+def test_snapshot_holds_live_products_only(repository, tmp_path):
+    saved = repository.save(make_product())
+    repository.delete(saved.id)
+    kept = repository.save(make_product(name="Mouse"))
+    snapshot = tmp_path / "catalog.jsonl"
+
+    source = InMemoryProductRepository()
+    source.refresh_from(repository)
+
+    assert source.export_snapshot(str(snapshot)) == 1
+    loaded = InMemoryProductRepository()
+    loaded.load_snapshot(str(snapshot))
+    assert [p.id for p in loaded.get_all()] == [kept.id]
+    assert loaded.get_archived_by_id(saved.id) is None
+
+
+def test_get_all_after_pages_by_key(repository):
+    products = [repository.save(make_product(name=f"p{i}")) for i in range(12)]
+    expected = sorted(str(product.id) for product in products)
+
+    first = repository.get_all_after(None, limit=5)
+    second = repository.get_all_after(first[-1].id, limit=5)
+    last = repository.get_all_after(second[-1].id, limit=5)
+
+    assert [str(p.id) for p in first + second + last] == expected
+    assert repository.get_all_after(last[-1].id, limit=5) == []
+
+
+def test_delete_during_keyset_paging_skips_nothing(repository):
+    products = [repository.save(make_product(name=f"p{i}")) for i in range(10)]
+    expected = sorted(str(product.id) for product in products)
+
+    first = repository.get_all_after(None, limit=4)
+    repository.delete(first[0].id)
+    rest = repository.get_all_after(first[-1].id, limit=100)
+
+    assert [str(p.id) for p in first + rest] == expected
+
+
+def test_refresh_copies_catalog_in_key_order(repository):
+    for i in range(7):
+        repository.save(make_product(name=f"p{i}"))
+
+    copy = InMemoryProductRepository()
+
+    assert copy.refresh_from(repository, batch_size=3) == 7
+    assert [key(p) for p in copy.get_all()] == [key(p) for p in repository.get_all()]
+
+
+def test_refresh_keeps_products_after_one_deleted_mid_refresh(repository):
+    products = [repository.save(make_product(name=f"p{i}")) for i in range(9)]
+    deleted = []
+
+    class DeletingSource:
+        # Deletes the first product of the catalog once the first page was read
+        def get_all_after(self, after_id, limit):
+            page = repository.get_all_after(after_id, limit)
+            if not deleted:
+                deleted.append(page[0].id)
+                repository.delete(page[0].id)
+            return page
+
+    copy = InMemoryProductRepository()
+    copy.refresh_from(DeletingSource(), batch_size=3)
+
+    assert sorted(str(p.id) for p in copy.get_all()) == sorted(str(p.id) for p in products)
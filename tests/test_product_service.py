@@ -0,0 +1,106 @@
+"""
+Tests for ProductService optimistic concurrency handling
+"""
+from decimal import Decimal
+
+import pytest
+
+from application.dtos.product_dto import CreateProductDTO, UpdateProductDTO, UpdateStockDTO
+from application.services.product_service import ProductService
+from domain.exceptions.product_exceptions import (
+    ConcurrencyConflictError,
+    PreconditionFailedError,
+)
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+
+
+class RacingRepository(InMemoryProductRepository):
+    """
+    Repository where another writer updates the product right before
+    each of the first `races` saves
+    """
+
+    def __init__(self, races: int):
+        super().__init__()
+        self.races = races
+
+    def save(self, product):
+        if self.races and self.exists(product.id):
+            self.races -= 1
+            concurrent = self.get_by_id(product.id)
+            concurrent.increase_stock(1)
+            super().save(concurrent)
+        return super().save(product)
+
+
+def create(service: ProductService):
+    return service.create_product(
+        CreateProductDTO(name="Keyboard", description=None, price=Decimal("10"), stock_quantity=5)
+    )
+
+
+def test_update_with_matching_version_bumps_version():
+    service = ProductService(InMemoryProductRepository())
+    product = create(service)
+
+    updated = service.update_product(product.id, UpdateProductDTO(name="Mouse"), expected_versions={1})
+
+    assert updated.name == "Mouse"
+    assert updated.version == 2
+
+
+def test_update_with_stale_version_fails_precondition():
+    service = ProductService(InMemoryProductRepository())
+    product = create(service)
+    service.update_product(product.id, UpdateProductDTO(name="Mouse"))
+
+    with pytest.raises(PreconditionFailedError) as error:
+        service.update_product(product.id, UpdateProductDTO(name="Pad"), expected_versions={1})
+
+    assert error.value.current_version == 2
+
+
+def test_lost_race_with_if_match_fails_precondition():
+    repository = RacingRepository(races=1)
+    service = ProductService(repository, max_update_retries=3)
+    product = create(service)
+
+    with pytest.raises(PreconditionFailedError) as error:
+        service.update_product(product.id, UpdateProductDTO(name="Mouse"), expected_versions={1})
+
+    assert error.value.current_version == 2
+    assert repository.get_by_id(product.id).name == "Keyboard"
+
+
+def test_lost_race_without_retries_conflicts():
+    repository = RacingRepository(races=1)
+    service = ProductService(repository)
+    product = create(service)
+
+    with pytest.raises(ConcurrencyConflictError) as error:
+        service.reduce_stock(product.id, UpdateStockDTO(quantity=1))
+
+    assert not isinstance(error.value, PreconditionFailedError)
+
+
+def test_lost_race_is_retried_on_fresh_read():
+    repository = RacingRepository(races=2)
+    service = ProductService(repository, max_update_retries=2)
+    product = create(service)
+
+    reduced = service.reduce_stock(product.id, UpdateStockDTO(quantity=1))
+
+    # Two concurrent increases (+1 each) were kept, then our reduction applied
+    assert reduced.stock_quantity == 6
+    assert reduced.version == 4
+
+
+def test_update_matches_any_listed_version():
+    service = ProductService(InMemoryProductRepository())
+    product = create(service)
+    service.update_product(product.id, UpdateProductDTO(name="Mouse"))
+
+    updated = service.update_product(product.id, UpdateProductDTO(name="Pad"), expected_versions={1, 2})
+
+    assert updated.name == "Pad"
+    assert updated.version == 3
@@ -0,0 +1,50 @@
+"""
+Tests for conditional product updates (If-Match)
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from application.dtos.product_dto import CreateProductDTO, UpdateProductDTO
+from application.services.product_service import ProductService
+from infrastructure.api.controllers.product_controller import get_product_service
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+from main import app
+
+
+@pytest.fixture
+def product_url():
+    """
+    URL of a product at version 2, served from an in-memory catalog
+    """
+    service = ProductService(InMemoryProductRepository())
+    product = service.create_product(
+        CreateProductDTO(name="Keyboard", description=None, price=Decimal("10"), stock_quantity=5)
+    )
+    service.update_product(product.id, UpdateProductDTO(name="Mouse"))
+    app.dependency_overrides[get_product_service] = lambda: service
+    yield f"/api/products/{product.id}"
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("if_match,status_code", [
+    ('"2"', 200),
+    ('"1", "2"', 200),
+    ('"1","2","9"', 200),
+    ("*", 200),
+    ('"1"', 412),
+    ('W/"2"', 412),
+    ('W/"1", W/"2"', 412),
+    ('"some-other-tag"', 412),
+    ('"2', 400),
+    ('"1",,"2"', 400),
+])
+def test_if_match_uses_strong_comparison(product_url, if_match, status_code):
+    client = TestClient(app)
+
+    response = client.put(product_url, json={"name": "Pad"}, headers={"If-Match": if_match})
+
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert response.headers["ETag"] == '"3"'
@@ -0,0 +1,246 @@
+"""
+Tests for hash-sharded product storage and resharding
+Shards are SQLite database files
+"""
+from dataclasses import replace
+from datetime import timedelta
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from sqlalchemy.orm import Session
+
+from domain.entities.product import Product
+from domain.exceptions.product_exceptions import ConcurrencyConflictError
+from infrastructure.database.archival import ProductArchiver
+from infrastructure.database.models import ProductArchiveModel, ProductModel
+from infrastructure.database.reshard import RESHARDED_MODELS, database_identity, reshard
+from infrastructure.repositories import primary_product_repository
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+from infrastructure.repositories.sharded_product_repository import (
+    ShardedProductRepository,
+    shard_index,
+)
+from tests.conftest import create_sqlite_session_factory
+
+
+def make_product(number: int) -> Product:
+    product = Product.create(
+        name=f"p{number}", description=None, price=Decimal("10.00"), stock_quantity=number
+    )
+    # Fixed IDs keep the spread over shards deterministic
+    return replace(product, id=UUID(int=number * 7919 + 1))
+
+
+def make_sharded(factories, executor):
+    sessions = [factory() for factory in factories]
+    repository = ShardedProductRepository(
+        [MySQLProductRepository(session) for session in sessions], executor
+    )
+    return repository, sessions
+
+
+def ids_in(factory, model) -> list:
+    session = factory()
+    try:
+        return [row.id for row in session.query(model.id)]
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def sharded(shard_session_factories, shard_executor):
+    repository, sessions = make_sharded(shard_session_factories, shard_executor)
+    yield repository
+    for session in sessions:
+        session.close()
+
+
+def test_products_land_on_their_shard(sharded, shard_session_factories):
+    products = [sharded.save(make_product(number)) for number in range(30)]
+
+    for index, factory in enumerate(shard_session_factories):
+        ids = ids_in(factory, ProductModel)
+        assert ids
+        assert all(shard_index(UUID(product_id), 3) == index for product_id in ids)
+
+    assert sum(len(ids_in(factory, ProductModel)) for factory in shard_session_factories) == 30
+    assert all(sharded.get_by_id(product.id).name == product.name for product in products)
+
+
+def test_stale_write_conflicts_on_owning_shard(sharded):
+    saved = sharded.save(make_product(1))
+    first = sharded.get_by_id(saved.id)
+    second = sharded.get_by_id(saved.id)
+    first.increase_stock(1)
+    sharded.save(first)
+    second.increase_stock(2)
+
+    with pytest.raises(ConcurrencyConflictError):
+        sharded.save(second)
+
+    assert sharded.get_by_id(saved.id).stock_quantity == 2
+    assert sharded.get_by_id(saved.id).version == 2
+
+
+@pytest.mark.parametrize("skip,limit", [(0, 100), (0, 1), (0, 7), (5, 5), (13, 4), (38, 10), (40, 3)])
+def test_get_all_matches_single_database(sharded, session_factory, skip, limit):
+    session = session_factory()
+    reference = MySQLProductRepository(session)
+    for number in range(40):
+        product = make_product(number)
+        sharded.save(product)
+        reference.save(product)
+
+    expected = [product.id for product in reference.get_all(skip=skip, limit=limit)]
+
+    assert [product.id for product in sharded.get_all(skip=skip, limit=limit)] == expected
+    session.close()
+
+
+def test_delete_and_archive_stay_on_owning_shard(sharded, shard_session_factories):
+    products = [sharded.save(make_product(number)) for number in range(9)]
+    deleted = products[4]
+    owner = shard_index(deleted.id, 3)
+
+    assert sharded.delete(deleted.id)
+    assert not sharded.exists(deleted.id)
+    assert sharded.get_archived_by_id(deleted.id).deleted_at is not None
+
+    for factory in shard_session_factories:
+        ProductArchiver(factory, grace_period=timedelta(0), pause_seconds=0).run()
+
+    for index, factory in enumerate(shard_session_factories):
+        archived_ids = ids_in(factory, ProductArchiveModel)
+        assert archived_ids == ([str(deleted.id)] if index == owner else [])
+    assert sharded.get_archived_by_id(deleted.id).name == deleted.name
+    assert len(sharded.get_all()) == 8
+
+
+@pytest.mark.parametrize("use_shared_executor", [True, False])
+def test_edge_refresh_reads_every_shard(
+    sharded, shard_session_factories, shard_executor, monkeypatch, use_shared_executor
+):
+    products = [sharded.save(make_product(number)) for number in range(25)]
+    sharded.delete(products[3].id)
+    monkeypatch.setattr(primary_product_repository, "ShardSessionLocals", shard_session_factories)
+
+    copy = InMemoryProductRepository()
+    with primary_product_repository.primary_product_repository(
+        shard_executor if use_shared_executor else None
+    ) as primary:
+        assert isinstance(primary, ShardedProductRepository)
+        assert copy.refresh_from(primary, batch_size=4) == 24
+
+    assert [product.id for product in copy.get_all()] == [product.id for product in sharded.get_all()]
+
+
+def seed_shards(urls, executor, count: int = 60, archived: int = 10) -> dict:
+    """
+    Fill a shard layout with live and archived products
+    Returns the IDs expected in each table
+    """
+    factories = [create_sqlite_session_factory(url[len("sqlite:///"):]) for url in urls]
+    repository, sessions = make_sharded(factories, executor)
+    products = [repository.save(make_product(number)) for number in range(count)]
+    for product in products[:archived]:
+        repository.delete(product.id)
+    for session in sessions:
+        session.close()
+    for factory in factories:
+        ProductArchiver(factory, grace_period=timedelta(0), pause_seconds=0).run()
+        factory.kw["bind"].dispose()
+
+    return {
+        ProductModel: sorted(str(product.id) for product in products[archived:]),
+        ProductArchiveModel: sorted(str(product.id) for product in products[:archived]),
+    }
+
+
+def assert_placed(urls, expected: dict, retired_urls=()) -> None:
+    """
+    Every row exists exactly once, on the shard shard_index gives it
+    """
+    factories = {url: create_sqlite_session_factory(url[len("sqlite:///"):]) for url in [*urls, *retired_urls]}
+    try:
+        for model in RESHARDED_MODELS:
+            seen = []
+            for index, url in enumerate(urls):
+                ids = ids_in(factories[url], model)
+                assert all(shard_index(UUID(row_id), len(urls)) == index for row_id in ids)
+                seen.extend(ids)
+            for url in retired_urls:
+                assert ids_in(factories[url], model) == []
+            assert sorted(seen) == expected[model]
+    finally:
+        for factory in factories.values():
+            factory.kw["bind"].dispose()
+
+
+@pytest.fixture
+def shard_urls(tmp_path) -> list:
+    return [f"sqlite:///{tmp_path / f'reshard_{index}.db'}" for index in range(3)]
+
+
+def test_reshard_three_to_two_and_back(shard_urls, shard_executor):
+    expected = seed_shards(shard_urls, shard_executor)
+
+    moved = reshard(shard_urls, shard_urls[:2], batch_size=7)
+
+    assert moved["products"] > 0
+    assert_placed(shard_urls[:2], expected, retired_urls=shard_urls[2:])
+
+    reshard(shard_urls[:2], shard_urls, batch_size=7)
+
+    assert_placed(shard_urls, expected)
+    assert reshard(shard_urls, shard_urls) == {"products": 0, "products_archive": 0}
+
+
+@pytest.mark.parametrize("failing_commit", [1, 2, 4, 7])
+@pytest.mark.parametrize("layout", ["split", "merge"])
+def test_interrupted_reshard_can_be_rerun(shard_urls, shard_executor, monkeypatch, layout, failing_commit):
+    if layout == "split":
+        sources, targets = shard_urls[:2], shard_urls
+    else:
+        sources, targets = shard_urls, shard_urls[:2]
+    expected = seed_shards(sources, shard_executor)
+
+    commit = Session.commit
+    calls = []
+
+    def failing(session):
+        calls.append(1)
+        if len(calls) == failing_commit:
+            raise RuntimeError("connection lost")
+        commit(session)
+
+    monkeypatch.setattr(Session, "commit", failing)
+    with pytest.raises(RuntimeError):
+        reshard(sources, targets, batch_size=5)
+    monkeypatch.setattr(Session, "commit", commit)
+
+    reshard(sources, targets, batch_size=5)
+
+    assert_placed(targets, expected, retired_urls=[url for url in sources if url not in targets])
+
+
+@pytest.mark.parametrize("alias", [
+    lambda url: url.replace("sqlite:///", "sqlite+pysqlite:///"),
+    lambda url: url + "?timeout=5",
+    lambda url: url.replace("/reshard_0.db", "/./reshard_0.db"),
+])
+def test_reshard_refuses_two_spellings_of_one_database(shard_urls, shard_executor, alias):
+    expected = seed_shards(shard_urls[:1], shard_executor)
+
+    with pytest.raises(ValueError):
+        reshard(shard_urls[:1], [alias(shard_urls[0]), shard_urls[1]])
+
+    assert_placed(shard_urls[:1], expected)
+
+
+def test_database_identity_ignores_driver_port_and_query():
+    assert database_identity("mysql+pymysql://u:p@DB:3306/products?charset=utf8mb4") == \
+        database_identity("mysql://other@db/products")
+    assert database_identity("mysql://u@db/products_0") != database_identity("mysql://u@db/products_1")
+    assert database_identity("mysql://u@db:3307/products") != database_identity("mysql://u@db/products")
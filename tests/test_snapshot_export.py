@@ -0,0 +1,34 @@
+"""
+Tests for exporting the primary catalog to a snapshot file
+"""
+import sys
+from contextlib import contextmanager
+from decimal import Decimal
+
+from domain.entities.product import Product
+from infrastructure.repositories import in_memory_product_repository, primary_product_repository
+from infrastructure.repositories.in_memory_product_repository import InMemoryProductRepository
+from infrastructure.repositories.product_repository_impl import MySQLProductRepository
+
+
+def test_export_command_writes_loadable_snapshot(session_factory, tmp_path, monkeypatch):
+    session = session_factory()
+    primary = MySQLProductRepository(session)
+    for i in range(5):
+        primary.save(Product.create(name=f"p{i}", description=None, price=Decimal("1.50"), stock_quantity=i))
+    primary.delete(primary.get_all()[0].id)
+
+    @contextmanager
+    def open_primary():
+        yield primary
+
+    snapshot = tmp_path / "catalog.jsonl"
+    monkeypatch.setattr(primary_product_repository, "primary_product_repository", open_primary)
+    monkeypatch.setattr(sys, "argv", ["prog", "export", str(snapshot), "--batch-size", "2"])
+
+    in_memory_product_repository.main()
+
+    loaded = InMemoryProductRepository()
+    assert loaded.load_snapshot(str(snapshot)) == 4
+    assert [p.id for p in loaded.get_all()] == [p.id for p in primary.get_all()]
+    session.close()